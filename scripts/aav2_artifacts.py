@@ -9,7 +9,13 @@ from __future__ import annotations
 from dataclasses import dataclass, field, asdict
 from typing import List, Dict, Any, Optional
 from datetime import datetime
-import json
+from pathlib import Path
+import asyncio, json
+
+try:
+    import orjson  # optional: C JSON encoder/decoder for artifact files
+except ImportError:
+    orjson = None
 
 @dataclass
 class CommandExecution:
@@ -183,11 +189,23 @@ class SynthesisReport:
 
 def save_artifact(artifact: Any, path: str) -> None:
     """Save structured artifact to disk"""
+    if orjson is not None:
+        Path(path).write_bytes(orjson.dumps(artifact.to_dict(), option=orjson.OPT_INDENT_2))
+        return
     with open(path, 'w', encoding='utf-8') as f:
         f.write(artifact.to_json())
 
+async def save_artifact_async(artifact: Any, path: str) -> None:
+    """
+    save_artifact on a worker thread, so independent writes can overlap:
+    await asyncio.gather(save_artifact_async(a, p1), save_artifact_async(b, p2))
+    """
+    await asyncio.to_thread(save_artifact, artifact, path)
+
 def load_artifact(path: str) -> dict:
     """Load structured artifact from disk"""
+    if orjson is not None:
+        return orjson.loads(Path(path).read_bytes())
     with open(path, 'r', encoding='utf-8') as f:
         return json.load(f)
 
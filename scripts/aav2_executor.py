@@ -8,9 +8,9 @@ Implements:
 - Structured transcript output (MetaGPT pattern)
 """
 from __future__ import annotations
-import sys, subprocess, time, uuid
+import os, re, shlex, sys, subprocess, time, uuid
 from pathlib import Path
-from typing import List, Optional
+from typing import Iterator, List, Optional
 
 # Add parent to path
 sys.path.insert(0, str(Path(__file__).parent.parent))
@@ -20,16 +20,117 @@ from scripts.aav2_artifacts import (
     CommandExecution, ExecutionTranscript, ReflectionResult,
     timestamp_now, save_artifact
 )
+from scripts.aav2_workspace import COMMAND_BACKENDS, default_backend, host_path, workspace_root
 
-def run_command_in_sandbox(cmd: str, timeout: int = 1800) -> dict:
+# Anything that needs a real shell (pipes, chaining, expansion, globs) goes to the sandbox
+_SHELL_SYNTAX_RE = re.compile(r"[;&|$`*?<(){}\\\[\]~#]")
+
+
+def run_command_inprocess(cmd: str) -> Optional[dict]:
     """
-    Execute command inside agent-sandbox container.
+    Execute simple file commands (mkdir, echo > file, cat, ls) with Python builtins.
+
+    Only paths that stay inside /workspace (after `..` and symlinks are resolved)
+    are handled, mapped onto $AAV2_WORKSPACE_ROOT by aav2_workspace.host_path.
+    Returns None for anything else so the caller falls back to
+    run_command_in_sandbox.
+
+    `ls` takes at most one operand. Directory listings are sorted by code
+    point (C-locale order), whereas the sandbox's ls sorts by its locale, so
+    mixed-case names may be ordered differently between the two backends.
 
     Returns: {ok: bool, stdout: str, stderr: str, returncode: int, duration_sec: float}
     """
     start_time = time.time()
+    if _SHELL_SYNTAX_RE.search(cmd):
+        return None
+    try:
+        argv = shlex.split(cmd)
+    except ValueError:
+        return None
+    if not argv:
+        return None
 
-    # Check if agent-sandbox is running
+    root = workspace_root()
+    prog, args = argv[0], argv[1:]
+    redirect = None
+    if prog == "echo" and len(args) >= 2 and args[-2] in (">", ">>"):
+        redirect, args = (args[-2], args[-1]), args[:-2]
+    if any(">" in a for a in args) or (prog == "echo" and args[:1] and args[0].startswith("-")):
+        return None
+
+    if prog == "mkdir":
+        parents = args[:1] == ["-p"]
+        targets = args[1:] if parents else args
+    elif prog == "echo":
+        targets = [redirect[1]] if redirect else []
+    elif prog == "cat":
+        targets = args
+    elif prog == "ls":
+        # Several operands mean files-then-"dir:"-sections output; leave that to real ls
+        targets = args or ["."]
+        if len(targets) > 1:
+            return None
+    else:
+        return None
+    if (prog != "echo" and not targets) or any(t.startswith("-") for t in targets):
+        return None
+    paths = [host_path(t, root) for t in targets]
+    if None in paths:
+        return None
+
+    stdout, stderr, returncode = [], [], 0
+    if prog == "mkdir":
+        for t, path in zip(targets, paths):
+            try:
+                path.mkdir(parents=parents, exist_ok=parents)
+            except OSError as e:
+                stderr.append(f"mkdir: cannot create directory '{t}': {e.strerror}\n")
+                returncode = 1
+    elif prog == "echo":
+        text = " ".join(args) + "\n"
+        if redirect:
+            try:
+                with open(paths[0], "a" if redirect[0] == ">>" else "w", encoding="utf-8") as f:
+                    f.write(text)
+            except OSError as e:
+                stderr.append(f"bash: {targets[0]}: {e.strerror}\n")
+                returncode = 1
+        else:
+            stdout.append(text)
+    elif prog == "cat":
+        for t, path in zip(targets, paths):
+            try:
+                stdout.append(path.read_text(encoding="utf-8", errors="replace"))
+            except OSError as e:
+                stderr.append(f"cat: {t}: {e.strerror}\n")
+                returncode = 1
+    else:
+        t, path = targets[0], paths[0]
+        try:
+            # A file operand is echoed as given, like coreutils ls
+            names = sorted(os.listdir(path)) if path.is_dir() else [t] if path.exists() else None
+        except OSError as e:
+            stderr.append(f"ls: cannot open directory '{t}': {e.strerror}\n")
+            returncode = 2
+        else:
+            if names is None:
+                stderr.append(f"ls: cannot access '{t}': No such file or directory\n")
+                returncode = 2
+            else:
+                stdout.extend(f"{n}\n" for n in names if path.is_file() or not n.startswith("."))
+
+    return {
+        "ok": returncode == 0,
+        "stdout": "".join(stdout),
+        "stderr": "".join(stderr),
+        "returncode": returncode,
+        "duration_sec": time.time() - start_time
+    }
+
+
+def _sandbox_missing(start_time: float) -> Optional[dict]:
+    """Error result if the agent-sandbox container is not running, else None"""
     check = subprocess.run(
         ["docker", "ps", "--filter", "name=agent-sandbox", "--format", "{{.Names}}"],
         capture_output=True, text=True, timeout=10
@@ -43,6 +144,21 @@ def run_command_in_sandbox(cmd: str, timeout: int = 1800) -> dict:
             "returncode": 1,
             "duration_sec": time.time() - start_time
         }
+    return None
+
+
+def run_command_in_sandbox(cmd: str, timeout: int = 1800) -> dict:
+    """
+    Execute command inside agent-sandbox container.
+
+    Returns: {ok: bool, stdout: str, stderr: str, returncode: int, duration_sec: float}
+    """
+    start_time = time.time()
+
+    # Check if agent-sandbox is running
+    missing = _sandbox_missing(start_time)
+    if missing:
+        return missing
 
     # Execute inside sandbox
     result = subprocess.run(
@@ -61,6 +177,133 @@ def run_command_in_sandbox(cmd: str, timeout: int = 1800) -> dict:
     }
 
 
+def run_commands_in_sandbox(cmds: List[str], timeout: int = 1800) -> Iterator[dict]:
+    """
+    Execute several commands with one `docker exec ... bash -c` instead of one per command.
+
+    Commands run in order and stop at the first failure, like execute_task does.
+    Each one runs in its own `bash -c` under coreutils `timeout`, so as with
+    separate runs it starts in /workspace with no shell state (cwd, variables,
+    options) from earlier commands, and gets timeout seconds of its own (exit code
+    124). A sentinel line after each command carries its exit code and end time
+    ($EPOCHREALTIME) so output is split back per command.
+
+    The docker exec as a whole is also limited to that budget per command, which
+    only matters for a sandbox without `timeout`. If that runs out, the
+    commands that finished are reported as usual and the one still running gets
+    exit code 124 with the budget in its stderr.
+
+    Yields one run_command_in_sandbox-style result per command that ran.
+    Lazy: nothing executes until the first result is requested.
+    """
+    start_time = time.time()
+    missing = _sandbox_missing(start_time)
+    if missing:
+        yield missing
+        return
+
+    sep = f"__AAV2_SEP_{uuid.uuid4().hex}__"
+    script = [
+        # -k: a command that ignores SIGTERM is killed 10 seconds later
+        f"if command -v timeout >/dev/null; then __aav2_timeout='timeout -k 10 {int(timeout)}'; "
+        "else __aav2_timeout=''; fi",
+        f"printf '%s start %s\\n' {sep} \"${{EPOCHREALTIME:-}}\"",
+    ]
+    for cmd in cmds:
+        script += [
+            f"$__aav2_timeout bash -c {shlex.quote(cmd)}",
+            "__aav2_rc=$?",
+            f"printf '\\n%s %d %s\\n' {sep} $__aav2_rc \"${{EPOCHREALTIME:-}}\"",
+            f"printf '\\n%s\\n' {sep} >&2",
+            "[ $__aav2_rc -eq 0 ] || exit $__aav2_rc",
+        ]
+    limit = (timeout + 10) * len(cmds)  # each command's timeout plus its kill grace
+    timed_out = False
+    try:
+        result = subprocess.run(
+            ["docker", "exec", "-w", "/workspace", "agent-sandbox", "bash", "-c", "\n".join(script)],
+            capture_output=True,
+            text=True,
+            timeout=limit
+        )
+        stdout, stderr, returncode = result.stdout, result.stderr, result.returncode
+    except subprocess.TimeoutExpired as e:
+        # Output captured before the kill still splits per command (it may be bytes here)
+        timed_out = True
+        stdout, stderr = (
+            (out.decode(errors="replace") if isinstance(out, bytes) else out or "")
+            for out in (e.stdout, e.stderr)
+        )
+        returncode = 124
+    elapsed = time.time() - start_time
+
+    # ["", "start", t0, out_1, rc_1, t_1, ..., out_n, rc_n, t_n, tail]
+    parts = re.split(rf"\n{sep} (\S+) (\S*)\n", "\n" + stdout)
+    errs = re.split(rf"\n{sep}\n", stderr)
+    stamps = parts[2::3]
+    outs = parts[3::3]
+    codes = parts[4::3]
+    ran = len(codes)
+    reported = 0.0
+    for k in range(ran):
+        try:
+            duration = float(stamps[k + 1]) - float(stamps[k])
+        except (ValueError, IndexError):
+            duration = elapsed / len(cmds)
+        reported += duration
+        rc = int(codes[k])
+        stderr_k = errs[k]
+        if rc == 124 and duration >= timeout:
+            stderr_k += f"Command timeout after {timeout} seconds"
+        yield {
+            "ok": rc == 0,
+            "stdout": outs[k],
+            "stderr": stderr_k,
+            "returncode": rc,
+            "duration_sec": duration
+        }
+        if rc != 0:
+            return
+
+    if ran < len(cmds):
+        stdout_tail = outs[ran] if len(outs) > ran else parts[-1]
+        stderr_tail = errs[ran] if len(errs) > ran else ""
+        if timed_out:
+            # Budget ran out while command ran+1 was executing - blame that one
+            yield {
+                "ok": False,
+                "stdout": stdout_tail,
+                "stderr": stderr_tail + f"Batch timeout after {limit} seconds "
+                                        f"(command {ran + 1}/{len(cmds)} still running)",
+                "returncode": returncode,
+                "duration_sec": max(0.0, elapsed - reported)
+            }
+            return
+        # Shell exited inside a command (e.g. `exit`) - nothing after it ran
+        yield {
+            "ok": False,
+            "stdout": stdout_tail,
+            "stderr": stderr_tail or "Batch shell exited before the next command",
+            "returncode": returncode or 1,
+            "duration_sec": 0.0
+        }
+
+
+# (pattern, issue, reasoning) for commands reflection always blocks; first match wins.
+# Checked before every other heuristic, so a dangerous command is blocked outright even
+# when a later branch (e.g. mkdir on a file-like path) would offer an alternative.
+_DANGEROUS_PATTERNS = [
+    (re.compile(r"rm\s+-rf\s+/"), "Destructive command - deletes entire filesystem",
+     "CRITICAL: This would delete the entire filesystem"),
+    (re.compile(r"dd\s+if=/dev/zero"), "Disk wipe command detected",
+     "This would overwrite disk data"),
+    (re.compile(r">\s*/dev/sd"), "Writing directly to block device",
+     "Direct block device writes are dangerous"),
+    (re.compile(r"(?P<f>[\w:]+)\s*\(\)\s*\{[^}]*(?P=f)\s*\|\s*(?P=f)\s*&"), "Fork bomb detected",
+     "This would exhaust the process table"),
+]
+
+
 def reflect_on_command(cmd: str) -> ReflectionResult:
     """
     Reflection pattern: Self-critique before execution.
@@ -77,17 +320,12 @@ def reflect_on_command(cmd: str) -> ReflectionResult:
     reasoning = "Command appears safe to execute"
 
     # Check for common issues
-    if "rm -rf /" in cmd or "rm -rf /*" in cmd:
-        potential_issues.append("Destructive command - deletes entire filesystem")
+    danger = next(((issue, why) for pattern, issue, why in _DANGEROUS_PATTERNS if pattern.search(cmd)), None)
+    if danger:
+        potential_issues.append(danger[0])
         risk_level = "high"
         proceed = False
-        reasoning = "CRITICAL: This would delete the entire filesystem"
-
-    elif "dd if=/dev/zero" in cmd:
-        potential_issues.append("Disk wipe command detected")
-        risk_level = "high"
-        proceed = False
-        reasoning = "This would overwrite disk data"
+        reasoning = danger[1]
 
     elif cmd.startswith("mkdir") and "." in cmd.split()[-1]:
         # Looks like trying to mkdir a file (has extension)
@@ -99,12 +337,6 @@ def reflect_on_command(cmd: str) -> ReflectionResult:
         proceed = False
         reasoning = "mkdir should create directory, but target looks like a file"
 
-    elif "> /dev/sd" in cmd:
-        potential_issues.append("Writing directly to block device")
-        risk_level = "high"
-        proceed = False
-        reasoning = "Direct block device writes are dangerous"
-
     # Docker build without context
     elif "docker build" in cmd and " ." not in cmd and " -f" in cmd:
         # Has Dockerfile but maybe missing build context
@@ -122,18 +354,29 @@ def reflect_on_command(cmd: str) -> ReflectionResult:
     )
 
 
-def execute_task(task_file: str, agent_id: Optional[str] = None, enable_reflection: bool = True) -> ExecutionTranscript:
+def execute_task(task_file: str, agent_id: Optional[str] = None, enable_reflection: bool = True,
+                 command_backend: Optional[str] = None) -> ExecutionTranscript:
     """
     Execute task with reflection pattern enabled.
 
+    command_backend: "sandbox" (docker exec) or "inprocess" (run_command_inprocess,
+    falling back to the sandbox). Defaults to "inprocess" when $AAV2_INPROCESS=1.
+    With reflection disabled, the sandbox backend runs all commands in a single
+    docker exec (run_commands_in_sandbox).
+
     Returns: ExecutionTranscript artifact
     """
     if agent_id is None:
         agent_id = f"executor_{uuid.uuid4().hex[:8]}"
+    if command_backend is None:
+        command_backend = default_backend()
+    if command_backend not in COMMAND_BACKENDS:
+        raise ValueError(f"Unknown command backend: {command_backend} (expected one of {COMMAND_BACKENDS})")
 
     print(f"\n[Executor Agent: {agent_id}]")
     print(f"Task: {task_file}")
     print(f"Reflection: {'enabled' if enable_reflection else 'disabled'}")
+    print(f"Backend: {command_backend}")
     print("")
 
     timestamp_start = timestamp_now()
@@ -153,6 +396,9 @@ def execute_task(task_file: str, agent_id: Optional[str] = None, enable_reflecti
     successful = 0
     failed = 0
     total_duration = 0.0
+    batched = None
+    if command_backend == "sandbox" and not enable_reflection and len(commands) > 1:
+        batched = run_commands_in_sandbox(commands, timeout=1800)
 
     for i, cmd in enumerate(commands):
         print(f"--- Command {i+1}/{len(commands)} ---")
@@ -185,7 +431,12 @@ def execute_task(task_file: str, agent_id: Optional[str] = None, enable_reflecti
 
         # Execute
         try:
-            result = run_command_in_sandbox(cmd, timeout=1800)
+            if batched is not None:
+                result = next(batched)
+            else:
+                result = run_command_inprocess(cmd) if command_backend == "inprocess" else None
+            if result is None:
+                result = run_command_in_sandbox(cmd, timeout=1800)
         except subprocess.TimeoutExpired:
             print("[TIMEOUT] Command exceeded 30 minute limit")
             exec_record = CommandExecution(
@@ -275,6 +526,7 @@ if __name__ == "__main__":
     ap.add_argument("task", help="Path to task file with EXECUTE: block")
     ap.add_argument("--agent-id", help="Agent ID (auto-generated if not provided)")
     ap.add_argument("--no-reflection", action="store_true", help="Disable reflection pattern")
+    ap.add_argument("--backend", choices=COMMAND_BACKENDS, help="Command backend (default: sandbox, or inprocess if AAV2_INPROCESS=1)")
     ap.add_argument("--output", default="reports/aav2_execution_transcript.json", help="Output path for transcript")
     args = ap.parse_args()
 
@@ -286,7 +538,8 @@ if __name__ == "__main__":
     transcript = execute_task(
         task_file=args.task,
         agent_id=args.agent_id,
-        enable_reflection=not args.no_reflection
+        enable_reflection=not args.no_reflection,
+        command_backend=args.backend
     )
 
     if transcript is None:
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+AAv2 Pipeline - Execute + Verify in One Pass
+
+Runs the executor and hands its transcript straight to the verifier in
+memory, instead of writing the transcript to disk and reading it back.
+Artifacts are only written when persist=True.
+"""
+from __future__ import annotations
+import sys
+from pathlib import Path
+from typing import Optional, Tuple
+
+# Add parent to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from scripts.aav2_executor import execute_task
+from scripts.aav2_verifier import verify_criteria
+from scripts.aav2_artifacts import ExecutionTranscript, VerificationReport, save_artifact
+
+
+def run_pipeline(task_file: str, agent_id: Optional[str] = None, persist: bool = False,
+                 artifacts_dir: str = "reports", enable_reflection: bool = True
+                 ) -> Tuple[Optional[ExecutionTranscript], Optional[VerificationReport]]:
+    """
+    Execute task, then verify its SUCCESS_CRITERIA against the in-memory transcript.
+
+    agent_id: prefix for the executor/verifier IDs (auto-generated if not provided)
+    persist: also save <executor_id>_transcript.json and <verifier_id>_report.json
+             to artifacts_dir (orchestrator naming)
+
+    Returns: (transcript, report); report is None if execution or verification failed to run
+    """
+    transcript = execute_task(
+        task_file=task_file,
+        agent_id=f"{agent_id}_exec" if agent_id else None,
+        enable_reflection=enable_reflection
+    )
+    if transcript is None:
+        return None, None
+
+    report = verify_criteria(
+        task_file=task_file,
+        agent_id=f"{agent_id}_verify" if agent_id else None,
+        transcript_obj=transcript
+    )
+
+    if persist:
+        out = Path(artifacts_dir)
+        out.mkdir(parents=True, exist_ok=True)
+        save_artifact(transcript, str(out / f"{transcript.agent_id}_transcript.json"))
+        if report is not None:
+            save_artifact(report, str(out / f"{report.agent_id}_report.json"))
+
+    return transcript, report
+
+
+if __name__ == "__main__":
+    import argparse
+
+    ap = argparse.ArgumentParser(description="AAv2 Pipeline - execute and verify a task in one pass")
+    ap.add_argument("task", help="Path to task file with EXECUTE: and SUCCESS_CRITERIA: blocks")
+    ap.add_argument("--agent-id", help="Agent ID prefix (auto-generated if not provided)")
+    ap.add_argument("--no-reflection", action="store_true", help="Disable reflection pattern")
+    ap.add_argument("--artifacts-dir", default="reports", help="Where to save artifacts")
+    ap.add_argument("--no-persist", action="store_true", help="Do not save transcript/report artifacts")
+    args = ap.parse_args()
+
+    if not Path(args.task).exists():
+        print(f"ERROR: Task file not found: {args.task}")
+        sys.exit(1)
+
+    transcript, report = run_pipeline(
+        task_file=args.task,
+        agent_id=args.agent_id,
+        persist=not args.no_persist,
+        artifacts_dir=args.artifacts_dir,
+        enable_reflection=not args.no_reflection
+    )
+
+    if report is None:
+        sys.exit(1)
+
+    sys.exit(0 if transcript.failed_commands == 0 and report.overall_pass else 1)
@@ -6,9 +6,9 @@ Implements quality gates before marking task complete.
 Reads execution transcript, checks all SUCCESS_CRITERIA.
 """
 from __future__ import annotations
-import sys, subprocess, uuid
+import re, sys, subprocess, uuid
 from pathlib import Path
-from typing import List
+from typing import List, Optional
 
 # Add parent to path
 sys.path.insert(0, str(Path(__file__).parent.parent))
@@ -18,44 +18,97 @@ from scripts.aav2_artifacts import (
     ExecutionTranscript, VerificationReport, CriteriaCheck,
     timestamp_now, save_artifact, load_artifact
 )
+from scripts.aav2_workspace import COMMAND_BACKENDS, default_backend, host_path
 
 
-def run_check_in_sandbox(cmd: str) -> dict:
-    """Execute verification command in sandbox"""
+def run_check_in_sandbox(cmd: str, capture_stdout: bool = True) -> dict:
+    """Execute verification command in sandbox (capture_stdout=False: exit status only)"""
     try:
         result = subprocess.run(
             ["docker", "exec", "-w", "/workspace", "agent-sandbox", "bash", "-c", cmd],
-            capture_output=True,
+            stdout=subprocess.PIPE if capture_stdout else subprocess.DEVNULL,
+            stderr=subprocess.PIPE,
             text=True,
             timeout=30
         )
         return {
             "ok": result.returncode == 0,
-            "stdout": result.stdout,
+            "stdout": result.stdout or "",
             "stderr": result.stderr
         }
     except Exception as e:
         return {"ok": False, "stdout": "", "stderr": str(e)}
 
 
-def verify_criteria(task_file: str, transcript_path: str, agent_id: str = None) -> VerificationReport:
+def _bre_to_re(pattern: str) -> str:
+    """grep basic regex -> Python regex: + ? ( ) { } | are literal unless backslashed"""
+    out, i = [], 0
+    while i < len(pattern):
+        ch = pattern[i]
+        if ch == "\\" and i + 1 < len(pattern):
+            nxt = pattern[i + 1]
+            out.append(nxt if nxt in "+?(){}|" else ch + nxt)
+            i += 2
+            continue
+        out.append("\\" + ch if ch in "+?(){}|" else ch)
+        i += 1
+    return "".join(out)
+
+
+def check_inprocess(c: dict) -> Optional[dict]:
+    """
+    Check a file/grep criterion against $AAV2_WORKSPACE_ROOT, where the executor's
+    in-process backend writes. Returns None (check in the sandbox instead) for
+    command criteria and paths outside /workspace.
+    """
+    if c["type"] not in ("file", "grep"):
+        return None
+    path = host_path(c["path"])
+    if path is None:
+        return None
+    if c["type"] == "file":
+        return {"ok": path.is_file(), "stdout": "", "stderr": ""}
+    try:
+        regex = re.compile(_bre_to_re(c["pattern"]))
+        lines = path.read_text(encoding="utf-8", errors="replace").splitlines()
+    except (OSError, re.error) as e:
+        return {"ok": False, "stdout": "", "stderr": str(e)}
+    return {"ok": any(regex.search(line) for line in lines), "stdout": "", "stderr": ""}
+
+
+def verify_criteria(task_file: str, transcript_path: str = None, agent_id: str = None,
+                    transcript_obj: ExecutionTranscript = None,
+                    check_backend: Optional[str] = None) -> VerificationReport:
     """
     Verify all SUCCESS_CRITERIA from task.
 
+    transcript_obj: in-memory ExecutionTranscript to use instead of loading
+    transcript_path (see scripts/aav2_pipeline.py).
+    check_backend: "sandbox" (docker exec) or "inprocess" (check_inprocess, falling
+    back to the sandbox). Defaults like execute_task's command_backend, so criteria
+    are checked where the executor wrote.
+
     Returns: VerificationReport artifact
     """
     if agent_id is None:
         agent_id = f"verifier_{uuid.uuid4().hex[:8]}"
+    if check_backend is None:
+        check_backend = default_backend()
+    if check_backend not in COMMAND_BACKENDS:
+        raise ValueError(f"Unknown check backend: {check_backend} (expected one of {COMMAND_BACKENDS})")
 
     print(f"\n[Verifier Agent: {agent_id}]")
     print(f"Task: {task_file}")
-    print(f"Transcript: {transcript_path}")
+    print(f"Transcript: {transcript_path if transcript_obj is None else '<in-memory>'}")
     print("")
 
     # Load execution transcript
     try:
-        transcript_data = load_artifact(transcript_path)
-        transcript_id = f"{transcript_data['agent_id']}_{transcript_data['timestamp_end']}"
+        if transcript_obj is not None:
+            transcript_id = f"{transcript_obj.agent_id}_{transcript_obj.timestamp_end}"
+        else:
+            transcript_data = load_artifact(transcript_path)
+            transcript_id = f"{transcript_data['agent_id']}_{transcript_data['timestamp_end']}"
     except Exception as e:
         print(f"[ERROR] Failed to load transcript: {e}")
         return None
@@ -82,8 +135,9 @@ def verify_criteria(task_file: str, transcript_path: str, agent_id: str = None)
             # Check file exists
             path = c["path"]
             print(f"File exists: {path}")
-            res = run_check_in_sandbox(f"test -f {path} && echo OK || echo FAIL")
-            ok = "OK" in res.get("stdout", "")
+            res = (check_backend == "inprocess" and check_inprocess(c)) or \
+                run_check_in_sandbox(f"test -f {path}", capture_stdout=False)
+            ok = res.get("ok", False)
 
             check = CriteriaCheck(
                 criteria_type="file",
@@ -113,8 +167,9 @@ def verify_criteria(task_file: str, transcript_path: str, agent_id: str = None)
             pattern = c["pattern"]
             path = c["path"]
             print(f"Grep: '{pattern}' in {path}")
-            res = run_check_in_sandbox(f"cat {path} 2>/dev/null | grep -q '{pattern}' && echo OK || echo FAIL")
-            ok = "OK" in res.get("stdout", "")
+            res = (check_backend == "inprocess" and check_inprocess(c)) or \
+                run_check_in_sandbox(f"cat {path} 2>/dev/null | grep -q '{pattern}'", capture_stdout=False)
+            ok = res.get("ok", False)
 
             check = CriteriaCheck(
                 criteria_type="grep",
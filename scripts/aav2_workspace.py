@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+AAv2 Workspace - Host View of the Sandbox /workspace
+
+The executor's in-process backend and the verifier's in-process checks both
+work on $AAV2_WORKSPACE_ROOT instead of the agent-sandbox mount. This module
+owns that mapping, including the rule that a path may never resolve outside
+the workspace root.
+"""
+from __future__ import annotations
+import os
+from pathlib import Path
+from typing import Optional
+
+COMMAND_BACKENDS = ("sandbox", "inprocess")
+INPROCESS_ENV = "AAV2_INPROCESS"             # "1" makes "inprocess" the default backend
+WORKSPACE_ROOT_ENV = "AAV2_WORKSPACE_ROOT"   # host dir standing in for /workspace
+SANDBOX_WORKSPACE = "/workspace"
+
+
+def default_backend() -> str:
+    """Backend used when none is given: "inprocess" if $AAV2_INPROCESS=1, else "sandbox" """
+    return "inprocess" if os.environ.get(INPROCESS_ENV) == "1" else "sandbox"
+
+
+def workspace_root() -> Path:
+    """Host directory standing in for /workspace (default: ./workspace, the sandbox mount)"""
+    return Path(os.environ.get(WORKSPACE_ROOT_ENV) or Path(__file__).parent.parent / "workspace")
+
+
+def host_path(path: str, root: Optional[Path] = None) -> Optional[Path]:
+    """
+    Map a sandbox path onto the host workspace.
+
+    Returns None for absolute paths outside /workspace and for anything whose
+    `..` components or symlinks resolve outside the workspace root.
+    """
+    if root is None:
+        root = workspace_root()
+    if path == SANDBOX_WORKSPACE or path.startswith(SANDBOX_WORKSPACE + "/"):
+        candidate = root / path[len(SANDBOX_WORKSPACE):].lstrip("/")
+    elif path.startswith("/"):
+        return None
+    else:
+        candidate = root / path
+    try:
+        if not candidate.resolve().is_relative_to(root.resolve()):
+            return None
+    except (OSError, RuntimeError):
+        return None
+    return candidate
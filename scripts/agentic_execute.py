@@ -66,6 +66,7 @@ def build_observation(action: dict, result: dict, action_idx: int) -> dict:
         obs['stdout_preview'] = result.get('stdout', '')[:2000]
         obs['stderr_preview'] = result.get('stderr', '')[:2000]
         obs['stdout_lines'] = result.get('stdout_lines', 0)
+        obs['stdout_truncated'] = result.get('stdout_truncated', False)
 
         # Parse output files from stdout
         stdout_text = result.get('stdout', '')
@@ -9,21 +9,30 @@ Parses task files for:
 No LLM interpretation - runs commands exactly as written.
 """
 from __future__ import annotations
+from functools import lru_cache
 from pathlib import Path
-import re
+import copy, os, re
 
 EXECUTE_RE = re.compile(r'(?im)^\s*EXECUTE:\s*\n(?P<body>.*?)(?:^\s*(SUCCESS_CRITERIA:|\Z))', re.S|re.M)
 SUCCESS_RE = re.compile(r'(?im)^\s*SUCCESS_CRITERIA:\s*\n(?P<body>.*)', re.S|re.M)
+CODEFENCE_RE = re.compile(r'(?s)```.*?\n(.*?)```')
+HEREDOC_RE = re.compile(r"<<\s*'?\"?(\w+)'?\"?\s*$")
+# One match classifies a criterion line: "File exists: p", "command: c", "grep: re in p"
+CRITERION_RE = re.compile(r'(?i)(?:(?P<file>file exists)|(?P<command>command)|(?P<grep>grep)):(?P<rest>.*)$')
+GREP_RE = re.compile(r"\s*(.+?)\s+in\s+(.+)$", re.I)
 
 def _strip_codefences(text: str) -> str:
     """Remove triple-fence wrappers if present"""
-    text = re.sub(r'(?s)```.*?\n(.*?)```', r'\1', text)
+    text = CODEFENCE_RE.sub(r'\1', text)
     return text.strip()
 
 def parse_task(path: str|Path) -> dict:
     """
     Parse task file for EXECUTE and SUCCESS_CRITERIA blocks.
 
+    Results are memoized per (path, mtime_ns, size), so the executor, verifier and
+    tests re-reading one task file parse it once; editing the file invalidates.
+
     Returns:
         {
             "commands": ["cmd1", "cmd2", ...],
@@ -34,6 +43,12 @@ def parse_task(path: str|Path) -> dict:
             ]
         }
     """
+    path = os.fspath(path)
+    st = os.stat(path)
+    return copy.deepcopy(_parse_cached(path, st.st_mtime_ns, st.st_size))
+
+@lru_cache(maxsize=32)
+def _parse_cached(path: str, mtime_ns: int, size: int) -> dict:
     raw = Path(path).read_text(encoding="utf-8")
     exm = EXECUTE_RE.search(raw)
     scm = SUCCESS_RE.search(raw)
@@ -60,7 +75,7 @@ def parse_task(path: str|Path) -> dict:
 
         if "<<'" in line or '<<"' in line or "<< " in line:
             # Detect heredoc terminator token at end of line
-            m = re.search(r"<<\s*'?\"?(\w+)'?\"?\s*$", line)
+            m = HEREDOC_RE.search(line)
             end_token = (m.group(1) if m else "EOF")
             buf = [line]
             in_heredoc = True
@@ -78,12 +93,15 @@ def parse_task(path: str|Path) -> dict:
         if not s or s.startswith("#"):
             continue
 
-        if s.lower().startswith("file exists:"):
-            criteria.append({"type": "file", "path": s.split(":", 1)[1].strip()})
-        elif s.lower().startswith("command:"):
-            criteria.append({"type": "command", "cmd": s.split(":", 1)[1].strip()})
-        elif s.lower().startswith("grep:"):
-            m = re.match(r"grep:\s*(.+?)\s+in\s+(.+)$", s, re.I)
+        c = CRITERION_RE.match(s)
+        if not c:
+            continue
+        if c.group("file"):
+            criteria.append({"type": "file", "path": c.group("rest").strip()})
+        elif c.group("command"):
+            criteria.append({"type": "command", "cmd": c.group("rest").strip()})
+        else:
+            m = GREP_RE.match(c.group("rest"))
             if m:
                 criteria.append({
                     "type": "grep",
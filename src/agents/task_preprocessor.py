@@ -7,6 +7,45 @@ pushing agents toward the right tools for the job.
 
 import re
 
+HINTS_MARKER = "## 🔧 Capability Hints (Auto-Generated)"
+
+# One pass over the task text; the named group that matched gives the hint category
+_KEYWORD_RE = re.compile(
+    r'\b(?:'
+    r'(?P<web>web|latest|version|current|fetch|api|search)'     # Web/latest/versions → curl/wget
+    r'|(?P<docker>docker|build|image|container)'               # Docker/build/image → docker build
+    r'|(?P<gpu>gpu|cuda|test|verify|check|nvidia)'             # GPU/CUDA/test → verification
+    r'|(?P<train>train|model|epoch|batch)'                     # Training/model → long-running
+    r')\b',
+    re.IGNORECASE
+)
+
+_HINT_TEXT: dict[str, str] = {
+    'web': (
+        "- **Web lookups**: Use `agent.passthrough_shell` to run `curl` or `wget` "
+        "and save JSON/text to `/workspace/versions.json` or similar. "
+        "Do **not** hardcode versions from knowledge cutoff."
+    ),
+    'docker': (
+        "- **Docker builds**: Use `agent.passthrough_shell` to run `docker build` commands **NOW**. "
+        "Do **not** only write build scripts without executing them. "
+        "Save build logs to `/workspace/build.log`."
+    ),
+    'gpu': (
+        "- **GPU/Testing**: Use `agent.passthrough_shell` to run `nvidia-smi`, "
+        "`python -c \"import tensorflow; print(tensorflow.config.list_physical_devices('GPU'))\"`,"
+        " and other verification commands. "
+        "Do **not** only write test scripts - execute them and capture output."
+    ),
+    'train': (
+        "- **Training**: Use `agent.passthrough_shell` with appropriate `timeout_sec` parameter "
+        "for long-running training jobs."
+    ),
+}
+
+_HEADER = f"\n\n---\n\n{HINTS_MARKER}\n\n"
+_FOOTER = "\n\n**Remember**: Prefer execution via `agent.passthrough_shell` over writing scripts that you don't execute."
+
 
 def augment_task_brief(task_text: str) -> str:
     """
@@ -18,53 +57,24 @@ def augment_task_brief(task_text: str) -> str:
     Returns:
         Augmented task text with hints appended
     """
-    hints = []
-
-    # Detect keywords and add corresponding hints
-    text_lower = task_text.lower()
-
-    # Web/latest/versions → curl/wget hints
-    if re.search(r'\b(web|latest|version|current|fetch|api|search)\b', text_lower):
-        hints.append(
-            "- **Web lookups**: Use `agent.passthrough_shell` to run `curl` or `wget` "
-            "and save JSON/text to `/workspace/versions.json` or similar. "
-            "Do **not** hardcode versions from knowledge cutoff."
-        )
-
-    # Docker/build/image → docker build hints
-    if re.search(r'\b(docker|build|image|container)\b', text_lower):
-        hints.append(
-            "- **Docker builds**: Use `agent.passthrough_shell` to run `docker build` commands **NOW**. "
-            "Do **not** only write build scripts without executing them. "
-            "Save build logs to `/workspace/build.log`."
-        )
-
-    # GPU/CUDA/test → verification hints
-    if re.search(r'\b(gpu|cuda|test|verify|check|nvidia)\b', text_lower):
-        hints.append(
-            "- **GPU/Testing**: Use `agent.passthrough_shell` to run `nvidia-smi`, "
-            "`python -c \"import tensorflow; print(tensorflow.config.list_physical_devices('GPU'))\"`,"
-            " and other verification commands. "
-            "Do **not** only write test scripts - execute them and capture output."
-        )
-
-    # Training/model → long-running hints
-    if re.search(r'\b(train|model|epoch|batch)\b', text_lower):
-        hints.append(
-            "- **Training**: Use `agent.passthrough_shell` with appropriate `timeout_sec` parameter "
-            "for long-running training jobs."
-        )
+    # Nothing to do for empty text or text already augmented (e.g. on retries)
+    if not task_text or HINTS_MARKER in task_text:
+        return task_text
+
+    # Detect keywords and collect matching hint categories
+    matched = set()
+    for m in _KEYWORD_RE.finditer(task_text):
+        matched.add(m.lastgroup)
+        if len(matched) == len(_HINT_TEXT):
+            break
 
     # If no hints, return original
-    if not hints:
+    if not matched:
         return task_text
 
-    # Append hints section
-    hints_section = "\n\n---\n\n## 🔧 Capability Hints (Auto-Generated)\n\n"
-    hints_section += "\n\n".join(hints)
-    hints_section += "\n\n**Remember**: Prefer execution via `agent.passthrough_shell` over writing scripts that you don't execute."
-
-    return task_text + hints_section
+    # Append hints section (categories in fixed order)
+    hints = "\n\n".join(text for cat, text in _HINT_TEXT.items() if cat in matched)
+    return "".join((task_text, _HEADER, hints, _FOOTER))
 
 
 def preprocess_task_file(task_path: str, output_path: str = None) -> str:
@@ -84,16 +94,14 @@ def preprocess_task_file(task_path: str, output_path: str = None) -> str:
     if not task_file.exists():
         raise FileNotFoundError(f"Task file not found: {task_path}")
 
-    with open(task_file, 'r', encoding='utf-8') as f:
-        original_text = f.read()
+    original_text = task_file.read_text(encoding='utf-8')
 
     augmented_text = augment_task_brief(original_text)
 
     if output_path:
         output_file = Path(output_path)
         output_file.parent.mkdir(parents=True, exist_ok=True)
-        with open(output_file, 'w', encoding='utf-8') as f:
-            f.write(augmented_text)
+        output_file.write_text(augmented_text, encoding='utf-8')
 
     return augmented_text
 
@@ -1,7 +1,18 @@
 from pathlib import Path
-import json, shutil, hashlib, time, os
+import json, shutil, hashlib, time, os, fnmatch
+import concurrent.futures
 from .policy import Policy
 
+try:
+    import blake3  # optional: SIMD tree hash, much faster than sha256 on large files
+except ImportError:
+    blake3 = None
+
+try:
+    import orjson  # optional: C JSON encoder for manifest lines
+except ImportError:
+    orjson = None
+
 MANIFEST = Path('dataset/.manifests/dataset_manifest.jsonl')
 
 def sha256_file(p: Path) -> str:
@@ -11,44 +22,151 @@ def sha256_file(p: Path) -> str:
             h.update(chunk)
     return h.hexdigest()
 
+def resolve_hash_algo(requested: str) -> str:
+    # blake3 only when policy asks for it and the package is installed
+    if requested == 'blake3' and blake3 is not None:
+        return 'blake3'
+    return 'sha256'
+
+def digest_fields(algo: str, digest: str) -> dict:
+    # stable 'hash'/'hash_algo' keys; sha256 digests also keep the legacy 'sha256' key
+    fields = {'hash': digest, 'hash_algo': algo}
+    if algo == 'sha256':
+        fields['sha256'] = digest
+    return fields
+
+def new_hasher(algo: str):
+    if algo == 'blake3':
+        return blake3.blake3(max_threads=blake3.blake3.AUTO)
+    return hashlib.sha256()
+
+def copy_and_hash(src: Path, dst: Path, algo: str='sha256') -> str:
+    # single pass: read src once, write dst and update digest from the same buffer
+    h = new_hasher(algo)
+    with open(src, 'rb', buffering=0) as fi:
+        # 'xb': never overwrite a dst that appeared after the caller's exists() check
+        fo = open(dst, 'xb')
+        try:
+            with fo:
+                while True:
+                    buf = fi.read(1<<22)
+                    if not buf:
+                        break
+                    fo.write(buf)
+                    h.update(buf)
+            shutil.copystat(src, dst)
+        except BaseException:
+            # no partial file left in the immutable dataset without a manifest entry
+            dst.unlink(missing_ok=True)
+            raise
+    return h.hexdigest()
+
 def append_manifest(rec: dict):
+    append_manifest_batch([rec])
+
+def jsonl_bytes(recs: list[dict]) -> bytes:
+    if orjson is not None:
+        opts = orjson.OPT_NON_STR_KEYS | orjson.OPT_APPEND_NEWLINE
+        return b''.join(orjson.dumps(r, option=opts) for r in recs)
+    # same compact separators and raw UTF-8 as orjson, so manifest lines don't mix formats
+    return ''.join(json.dumps(r, ensure_ascii=False, separators=(',', ':')) + '\n' for r in recs).encode('utf-8')
+
+def append_manifest_batch(recs: list[dict]):
+    # one open + one write for the whole batch
+    if not recs:
+        return
     MANIFEST.parent.mkdir(parents=True, exist_ok=True)
-    with open(MANIFEST, 'a', encoding='utf-8') as f:
-        f.write(json.dumps(rec, ensure_ascii=False) + '\n')
+    with open(MANIFEST, 'ab') as f:
+        f.write(jsonl_bytes(recs))
 
 def ingest_promote(items: list[dict], policy: Policy, plan_id: str='unknown', actor: str='executor'):
-    results = []
-    for it in items:
+    # Runs as separate passes over parallel lists (validate, mkdir, copy+hash, manifest)
+    # so glob promotions of many small files don't pay per-item mkdir/syscall overhead.
+    results = [None] * len(items)
+    algo = resolve_hash_algo(policy.hash_algo())
+    # one timestamp for the whole batch: dated prefix and manifest ts agree across items
+    now = time.gmtime()
+    date_prefix = time.strftime('%Y/%m/%d', now)
+    iso_ts = time.strftime('%Y-%m-%dT%H:%M:%SZ', now)
+
+    # Pass 1: resolve + validate; survivors go into parallel lists
+    idxs, srcs, dsts, tags = [], [], [], []
+    claimed = set()
+    for i, it in enumerate(items):
         src = Path(it['src']).resolve()
         if not src.exists():
-            results.append({'src':str(src),'ok':False,'error':'missing src'}); continue
+            results[i] = {'src':str(src),'ok':False,'error':'missing src'}; continue
         if not policy.is_writable(src):
             # must come from staging or workspace per policy; enforce
-            results.append({'src':str(src),'ok':False,'error':'src not under writable roots'}); continue
+            results[i] = {'src':str(src),'ok':False,'error':'src not under writable roots'}; continue
         rel = it.get('relative_dst') or src.name
         # destination under dated prefix
-        ts = time.strftime('%Y/%m/%d', time.gmtime())
-        dst = Path('dataset') / ts / rel
-        dst.parent.mkdir(parents=True, exist_ok=True)
-        if dst.exists():
-            results.append({'src':str(src),'ok':False,'error':'dst exists'}); continue
-        # copy, then hash
-        shutil.copy2(src, dst)
-        digest = sha256_file(dst)
+        dst = Path('dataset') / date_prefix / rel
+        if dst in claimed or dst.exists():
+            results[i] = {'src':str(src),'ok':False,'error':'dst exists'}; continue
+        claimed.add(dst)
+        idxs.append(i); srcs.append(src); dsts.append(dst); tags.append(it.get('tags', {}))
+
+    # Pass 2: one mkdir per distinct parent
+    for parent in {d.parent for d in dsts}:
+        parent.mkdir(parents=True, exist_ok=True)
+
+    # Pass 3: copy and hash in one pass per file, a few files at a time
+    def _copy(pair):
+        try:
+            return copy_and_hash(pair[0], pair[1], algo), None
+        except FileExistsError:
+            return None, 'dst exists'
+        except OSError as e:
+            return None, f'copy failed: {e}'
+    if dsts:
+        with concurrent.futures.ThreadPoolExecutor(max_workers=min(4, len(dsts))) as executor:
+            copied = list(executor.map(_copy, zip(srcs, dsts)))
+    else:
+        copied = []
+
+    # Pass 4: manifest records, in item order, written in one append
+    recs = []
+    for i, src, dst, tag, (digest, err) in zip(idxs, srcs, dsts, tags, copied):
+        if err is not None:
+            results[i] = {'src':str(src),'ok':False,'error':err}; continue
         rec = {
-            'ts': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+            'ts': iso_ts,
             'src': str(src),
             'dst': str(dst),
-            'sha256': digest,
+            **digest_fields(algo, digest),
             'bytes': dst.stat().st_size,
             'actor': actor,
             'plan_id': plan_id,
-            'tags': it.get('tags', {}),
+            'tags': tag,
         }
-        append_manifest(rec)
-        results.append({'src':str(src),'dst':str(dst),'ok':True,'sha256':digest})
+        recs.append(rec)
+        results[i] = {'src':str(src),'dst':str(dst),'ok':True,**digest_fields(algo, digest)}
+    append_manifest_batch(recs)
     return results
 
+def iter_files(root: str):
+    # DirEntry.is_dir/is_file answer from the dirent type, so no per-entry stat
+    with os.scandir(root) as it:
+        for entry in it:
+            if entry.is_dir(follow_symlinks=False):
+                yield from iter_files(entry.path)
+            elif entry.is_file():
+                yield entry.path
+
+def match_files(src_path: Path, pattern: str) -> list[Path]:
+    """Files under src_path matching pattern; scandir for '**/<name>' and '<name>', glob otherwise."""
+    parts = pattern.split('/')
+    name_pat = parts[-1]
+    if '**' not in name_pat and parts[:-1] in ([], ['**']):
+        if parts[:-1]:
+            paths = iter_files(str(src_path))
+        else:
+            with os.scandir(src_path) as it:
+                paths = [e.path for e in it if e.is_file()]
+        return [Path(fp) for fp in paths if fnmatch.fnmatch(os.path.basename(fp), name_pat)]
+    return [f for f in src_path.glob(pattern) if f.is_file()]
+
 def ingest_promote_glob(src_dir: str, pattern: str, relative_dst_prefix: str, tags: dict, policy: Policy, plan_id: str='unknown', actor: str='executor'):
     """
     Promote files matching glob pattern to immutable dataset.
@@ -70,8 +188,7 @@ def ingest_promote_glob(src_dir: str, pattern: str, relative_dst_prefix: str, ta
         return [{'ok': False, 'error': f'src_dir not found: {src_dir}'}]
 
     # Find all matching files
-    matched_files = list(src_path.glob(pattern))
-    matched_files = [f for f in matched_files if f.is_file()]
+    matched_files = match_files(src_path, pattern)
 
     if not matched_files:
         return [{'ok': False, 'error': f'no files matched pattern: {pattern}'}]
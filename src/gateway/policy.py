@@ -1,5 +1,5 @@
 from pathlib import Path
-import yaml, json, re
+import json, re
 import os
 
 class Policy:
@@ -19,6 +19,7 @@ class Policy:
             else:
                 self.project_root = Path.cwd()
 
+        import yaml  # deferred: only needed once a Policy is actually built
         self.cfg = yaml.safe_load(Path(path).read_text(encoding='utf-8'))
 
     def within_roots(self, p: Path, roots:list[str]) -> bool:
@@ -44,6 +45,9 @@ class Policy:
         roots = self.cfg.get('constraints', {}).get('write_roots', [])
         return self.within_roots(p, roots)
 
+    def hash_algo(self) -> str:
+        return self.cfg.get('constraints', {}).get('manifest_hash_algo', 'sha256')
+
     def allow_action_type(self, t: str) -> bool:
         return any(a.get('type') == t for a in self.cfg.get('actions', []))
 
@@ -2,17 +2,70 @@ from pathlib import Path, PurePosixPath
 import json, time
 import sys
 sys.path.insert(0, str(Path(__file__).parent.parent))
-from gateway.gateway import ingest_promote
-from gateway.policy import Policy
+# gateway (and yaml via Policy) is imported lazily in execute_action/run_cycle:
+# log() and the plan_missing path don't need it
 
 LEDGER = Path("reports/ledger.jsonl")
+# stdout/stderr returned from shell actions keep the first and last bytes (64 KiB in all):
+# the head has early "Wrote:" lines and setup errors, the tail has final results
+OUTPUT_HEAD_BYTES = 8 * 1024
+OUTPUT_TAIL_BYTES = 56 * 1024
+
+SANDBOX_CHECK_TTL_SEC = 5.0
+_SANDBOX_CHECK = 0.0  # monotonic time agent-sandbox was last seen running (0.0: not cached)
+
+def _clip_text(data: bytes) -> str:
+    # Decode only the head and tail callers will see; build/training output can be many MB
+    if len(data) <= OUTPUT_HEAD_BYTES + OUTPUT_TAIL_BYTES:
+        return data.decode('utf-8', errors='replace')
+    omitted = len(data) - OUTPUT_HEAD_BYTES - OUTPUT_TAIL_BYTES
+    return (data[:OUTPUT_HEAD_BYTES].decode('utf-8', errors='replace')
+            + f"\n[... {omitted} bytes omitted ...]\n"
+            + data[-OUTPUT_TAIL_BYTES:].decode('utf-8', errors='replace'))
+
+def _count_lines(data: bytes) -> int:
+    # a final line without a trailing newline still counts
+    return data.count(b'\n') + (1 if data and not data.endswith(b'\n') else 0)
+
+def _output_fields(result) -> dict:
+    # stdout/stderr fields of a shell action result; stdout_bytes is the full size
+    return {
+        "stdout": _clip_text(result.stdout),
+        "stderr": _clip_text(result.stderr),
+        "stdout_lines": _count_lines(result.stdout),
+        "stdout_bytes": len(result.stdout),
+        "stdout_truncated": len(result.stdout) > OUTPUT_HEAD_BYTES + OUTPUT_TAIL_BYTES,
+    }
+
+def _sandbox_running() -> bool:
+    """
+    Is agent-sandbox running? A "running" answer is cached for SANDBOX_CHECK_TTL_SEC to
+    avoid a docker CLI spawn per action; "not running" is re-checked every time, so a
+    sandbox started mid-cycle is seen by the next action.
+    """
+    global _SANDBOX_CHECK
+    now = time.monotonic()
+    if _SANDBOX_CHECK and now - _SANDBOX_CHECK < SANDBOX_CHECK_TTL_SEC:
+        return True
+    import subprocess
+    check_result = subprocess.run(
+        ["docker", "inspect", "-f", "{{.State.Running}}", "agent-sandbox"],
+        capture_output=True,
+        text=True,
+        timeout=10
+    )
+    running = check_result.returncode == 0 and check_result.stdout.strip() == "true"
+    _SANDBOX_CHECK = now if running else 0.0
+    return running
 
 def log(kind, **kw):
     rec = {"ts": time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()), "kind": kind}
     rec.update(kw)
     LEDGER.parent.mkdir(parents=True, exist_ok=True)
-    with open(LEDGER, "a", encoding="utf-8") as f:
-        f.write(json.dumps(rec) + "\n")
+    # stdlib json.dumps on purpose: existing ledgers hold its ", "/": " separators and
+    # ASCII-escaped text, which orjson can't produce, and one line per call gains little from it
+    with open(LEDGER, "ab") as f:
+        f.write((json.dumps(rec) + "\n").encode("ascii"))
 
 def execute_action(action, policy, plan_id):
     """Execute a single action from the plan"""
@@ -29,14 +82,14 @@ def execute_action(action, policy, plan_id):
         path.parent.mkdir(parents=True, exist_ok=True)
 
         # Write the file
-        with open(path, 'w', encoding='utf-8') as f:
-            f.write(content)
+        path.write_text(content, encoding='utf-8')
 
         log("action_result", action_id=action_id, type=action_type, ok=True, path=str(path))
         return {"ok": True, "action_id": action_id, "path": str(path)}
 
     elif action_type == 'ingest.promote':
         # Promote files from staging to dataset
+        from gateway.gateway import ingest_promote
         items = action.get('items', [])
         results = ingest_promote(items, policy, plan_id=plan_id)
 
@@ -84,21 +137,20 @@ def execute_action(action, policy, plan_id):
                 cmd,
                 shell=True,
                 capture_output=True,
-                text=True,
                 timeout=600,  # 10 minute timeout for analysis
                 cwd=Path.cwd()
             )
 
             ok = result.returncode == 0
+            output = _output_fields(result)
             log("action_result", action_id=action_id, type=action_type, ok=ok,
-                returncode=result.returncode, stdout_lines=len(result.stdout.splitlines()))
+                returncode=result.returncode, stdout_lines=output["stdout_lines"])
 
             return {
                 "ok": ok,
                 "action_id": action_id,
                 "returncode": result.returncode,
-                "stdout": result.stdout,
-                "stderr": result.stderr
+                **output
             }
         except subprocess.TimeoutExpired:
             log("action_result", action_id=action_id, type=action_type, ok=False, error="timeout")
@@ -120,14 +172,7 @@ def execute_action(action, policy, plan_id):
 
         # Check if agent-sandbox container exists and is running
         try:
-            check_result = subprocess.run(
-                ["docker", "ps", "--filter", "name=agent-sandbox", "--format", "{{.Names}}"],
-                capture_output=True,
-                text=True,
-                timeout=10
-            )
-
-            if "agent-sandbox" not in check_result.stdout:
+            if not _sandbox_running():
                 error_msg = "agent-sandbox container not running. Run: scripts/start_agent_sandbox.sh"
                 log("action_result", action_id=action_id, type=action_type, ok=False, error=error_msg)
                 return {"ok": False, "action_id": action_id, "error": error_msg}
@@ -144,24 +189,23 @@ def execute_action(action, policy, plan_id):
             result = subprocess.run(
                 ["docker", "exec", "-w", "/workspace", "agent-sandbox", "bash", "-c", cmd],
                 capture_output=True,
-                text=True,
                 timeout=timeout_sec,
                 cwd=Path.cwd()
             )
 
             ok = result.returncode == 0
+            output = _output_fields(result)
             log("action_result", action_id=action_id, type=action_type, ok=ok,
                 returncode=result.returncode,
-                stdout_lines=len(result.stdout.splitlines()),
-                stderr_lines=len(result.stderr.splitlines()),
+                stdout_lines=output["stdout_lines"],
+                stderr_lines=_count_lines(result.stderr),
                 cmd_preview=cmd[:100])
 
             return {
                 "ok": ok,
                 "action_id": action_id,
                 "returncode": result.returncode,
-                "stdout": result.stdout,
-                "stderr": result.stderr
+                **output
             }
 
         except subprocess.TimeoutExpired:
@@ -203,6 +247,7 @@ def run_cycle():
         actions = plan.get('actions', [])
 
         # Load policy
+        from gateway.policy import Policy
         policy = Policy()
 
         # Execute each action
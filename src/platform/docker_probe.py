@@ -1,4 +1,7 @@
-import subprocess, os
+import functools, subprocess, os
+
+# The daemon's OS doesn't change under a running process: probe once, reuse the answer
+@functools.lru_cache(maxsize=1)
 def probe_mount_style() -> str:
     # Returns 'posix' | 'windows' | 'wslposix'
     pref = os.getenv('PREFERRED_MOUNT_STYLE')
@@ -12,3 +15,7 @@ def probe_mount_style() -> str:
         return 'posix'
     except Exception:
         return 'posix'
+
+def _reset() -> None:
+    """Forget the probed style (tests, or after PREFERRED_MOUNT_STYLE changes)."""
+    probe_mount_style.cache_clear()
@@ -1,7 +1,9 @@
 from __future__ import annotations
-import os, subprocess, sys
+import functools, os, re, subprocess, sys
 from pathlib import Path
 
+# The host OS can't change mid-process, so detection runs once
+@functools.lru_cache(maxsize=1)
 def is_wsl() -> bool:
     try:
         txt = Path('/proc/version').read_text()
@@ -9,25 +11,62 @@ def is_wsl() -> bool:
     except Exception:
         return False
 
+@functools.lru_cache(maxsize=1)
 def is_windows() -> bool:
     return os.name == 'nt' or sys.platform.startswith('win')
 
 def abspath(p: str|Path) -> Path:
     return Path(p).expanduser().resolve()
 
+_SLASH_TRANS = str.maketrans('\\', '/')
+_DRIVE_PATH_RE = re.compile(r'^[A-Za-z]:[\\/]')
+
+def _drive_to_mount(win_path: str, root: str = '/mnt/') -> str:
+    return f'{root}{win_path[0].lower()}/{win_path[2:].translate(_SLASH_TRANS).lstrip("/")}'
+
 def to_wsl_path(win_path: str) -> str:
     try:
         out = subprocess.check_output(['wslpath','-a',win_path], text=True).strip()
         return out
     except Exception:
-        drive = win_path[0].lower()
-        rest = win_path[2:].replace('\\','/').replace('\','/')
-        return f'/mnt/{drive}/{rest.lstrip("/")}'
+        return _drive_to_mount(win_path)
+
+@functools.lru_cache(maxsize=1)
+def _automount_root() -> str:
+    # Where WSL mounts drives: '/mnt/' unless /etc/wsl.conf sets another root
+    try:
+        drive_c = subprocess.check_output(['wslpath','-a','C:\\'], text=True).strip()
+        return drive_c.rstrip('/')[:-1]
+    except Exception:
+        return '/mnt/'
+
+def to_wsl_paths(win_paths: list[str]) -> list[str]:
+    """Batch to_wsl_path. wslpath takes one path per call, so drive-letter paths are
+    mapped against the automount root (one wslpath call per process in total); UNC and
+    other paths still go through to_wsl_path."""
+    return [_drive_to_mount(p, _automount_root()) if _DRIVE_PATH_RE.match(p) else to_wsl_path(p)
+            for p in win_paths]
+
+def _posix_mount_path(host_path: str|Path) -> str:
+    return abspath(host_path).as_posix()
+
+def _windows_mount_path(host_path: str|Path) -> str:
+    return str(abspath(host_path))
+
+def _select_mount_path():
+    # WSL and plain POSIX hosts both hand Docker posix paths
+    return _posix_mount_path if is_wsl() or not is_windows() else _windows_mount_path
+
+# Chosen once at import; _reset() re-detects
+_mount_path = _select_mount_path()
+
+def _reset() -> None:
+    """Re-run platform detection (tests that fake /proc/version or os.name)."""
+    global _mount_path
+    is_wsl.cache_clear()
+    is_windows.cache_clear()
+    _automount_root.cache_clear()
+    _mount_path = _select_mount_path()
 
 def docker_mount_host_path(host_path: str|Path) -> str:
-    p = abspath(host_path)
-    if is_wsl():
-        return p.as_posix()
-    if is_windows():
-        return str(p)
-    return p.as_posix()
+    return _mount_path(host_path)
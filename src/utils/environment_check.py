@@ -6,246 +6,514 @@ Prevents agents from proposing tests that can't execute in current environment.
 """
 
 import subprocess
-import shutil
+import asyncio
+import concurrent.futures
+import copy
+import functools
+import glob
+import hashlib
+import os
+import shlex
+import socket
+import threading
+import time
 from pathlib import Path
-from typing import Dict, List
+from typing import Callable, Dict, List, Optional
 import json
 
 
-def check_docker() -> Dict:
-    """Check Docker availability and configuration."""
+# Each check_* below is split into independent probes (name -> zero-arg callable) plus an
+# assembler that turns the probe outputs into the result dict. check_* runs its probes
+# in sequence; get_environment_capabilities() fans every probe out on one thread pool,
+# since they mostly wait on subprocesses.
+
+# Caps concurrent probe subprocesses when get_environment_capabilities() fans out; the
+# floor keeps small hosts overlapping probes, which mostly sleep on I/O.
+_SPAWN_SLOTS = threading.BoundedSemaphore(max(4, os.cpu_count() or 1))
+
+
+def _run(cmd: List[str], timeout: float = 5, want_stdout: bool = True) -> subprocess.CompletedProcess:
+    """
+    Run a probe command. stderr always goes to DEVNULL and stdout too unless wanted,
+    so availability checks allocate no pipes. The program is resolved to a full path
+    from the PATH index because CPython only uses posix_spawn (with close_fds=False)
+    for executables that contain a directory separator; otherwise it forks.
+    """
+    program = cmd[0] if os.sep in cmd[0] else _which(cmd[0]) or cmd[0]
+    with _SPAWN_SLOTS:
+        return subprocess.run(
+            [program, *cmd[1:]],
+            stdout=subprocess.PIPE if want_stdout else subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            text=True,
+            timeout=timeout,
+            close_fds=False
+        )
+
+
+def _run_probes(probes: Dict[str, Callable]) -> Dict:
+    return {name: probe() for name, probe in probes.items()}
+
+
+_MEMOIZED_CHECKS = []
+
+
+def _memoized(fn):
+    """Run a check_* once per process; callers get a deep copy so they can't mutate the cache."""
+    cached = functools.lru_cache(maxsize=None)(fn)
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        return copy.deepcopy(cached(*args, **kwargs))
+
+    wrapper.cache_clear = cached.cache_clear
+    _MEMOIZED_CHECKS.append(wrapper)
+    return wrapper
+
+
+def clear_check_caches() -> None:
+    """Forget every memoized check_* result so the next call probes again."""
+    for check in _MEMOIZED_CHECKS:
+        check.cache_clear()
+    _path_index.cache_clear()
+
+
+@functools.lru_cache(maxsize=4)
+def _path_index(path_env: str) -> Dict[str, List[str]]:
+    """Map each file name found on PATH (lowercased on Windows) to its full paths, in PATH order."""
+    index = {}
+    for directory in path_env.split(os.pathsep):
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    name = entry.name.lower() if os.name == 'nt' else entry.name
+                    index.setdefault(name, []).append(entry.path)
+        except OSError:
+            continue
+    return index
+
+
+def _which(cmd: str) -> Optional[str]:
+    """
+    shutil.which(cmd), answered from one scan of PATH per process instead of a
+    stat per PATH entry per tool. Honours PATHEXT on Windows.
+    """
+    index = _path_index(os.environ.get("PATH", os.defpath))
+    if os.name == 'nt':
+        exts = os.environ.get("PATHEXT", ".COM;.EXE;.BAT;.CMD").lower().split(';')
+        names = [cmd.lower()] + [cmd.lower() + ext for ext in exts if ext]
+    else:
+        names = [cmd]
+    return next((
+        path
+        for name in names
+        for path in index.get(name, ())
+        if os.path.isfile(path) and os.access(path, os.X_OK)
+    ), None)
+
+
+def _on_path(cmd: str) -> bool:
+    """shutil.which(cmd) is not None; see _which."""
+    return _which(cmd) is not None
+
+
+def _probe_docker_version():
+    try:
+        docker_version = _run(['docker', '--version'])
+        if docker_version.returncode == 0:
+            return docker_version.stdout.strip()
+    except (subprocess.TimeoutExpired, FileNotFoundError, subprocess.SubprocessError):
+        pass
+    return None
+
+
+def _probe_docker_compose() -> bool:
+    try:
+        compose_check = _run(['docker', 'compose', 'version'], want_stdout=False)
+        return compose_check.returncode == 0
+    except (subprocess.TimeoutExpired, FileNotFoundError, subprocess.SubprocessError):
+        return False
+
+
+def _probe_docker_buildx() -> bool:
+    try:
+        buildx_check = _run(['docker', 'buildx', 'version'], want_stdout=False)
+        return buildx_check.returncode == 0
+    except (subprocess.TimeoutExpired, FileNotFoundError, subprocess.SubprocessError):
+        return False
+
+
+def _docker_probes() -> Dict[str, Callable]:
+    return {
+        "version": _probe_docker_version,
+        "compose": _probe_docker_compose,
+        "buildx": _probe_docker_buildx,
+    }
+
+
+def _docker_result(probed: Dict) -> Dict:
     result = {
         "available": False,
         "version": None,
         "compose": False,
         "buildx": False,
-        "network": False
+        # docker has no cheap offline network probe; get_environment_capabilities()
+        # fills this from the network section
+        "network": None
     }
+    # compose/buildx only count when the docker CLI itself works
+    if probed["version"] is not None:
+        result["available"] = True
+        result["version"] = probed["version"]
+        result["compose"] = probed["compose"]
+        result["buildx"] = probed["buildx"]
+    return result
+
+
+@_memoized
+def check_docker() -> Dict:
+    """Check Docker availability and configuration."""
+    return _docker_result(_run_probes(_docker_probes()))
+
+
+# Device nodes the GPU drivers create; stat-ing them is far cheaper than starting
+# nvidia-smi/rocm-smi, which also initialise the driver. /dev/dxg is the WSL2 GPU bridge,
+# present for any vendor's GPU, so these nodes only rule NVIDIA out; nvidia-smi confirms it.
+NVIDIA_DEVICE_NODES = ("/dev/nvidiactl", "/dev/dxg")
+AMD_RENDER_NODES = "/dev/dri/renderD*"
 
+
+def _probe_nvidia(include_devices: bool = True):
+    """nvidia-smi device list, then nvcc version (only when a GPU answered).
+
+    On POSIX hosts without an NVIDIA device node this returns None without forking.
+    With include_devices=False nvidia-smi only has to answer (its output is not read)
+    and nvcc is skipped.
+    """
+    if os.name == "posix" and not any(os.path.exists(node) for node in NVIDIA_DEVICE_NODES):
+        return None
     try:
-        # Check docker command
-        docker_version = subprocess.run(
-            ['docker', '--version'],
-            capture_output=True,
-            text=True,
-            timeout=5
-        )
+        if not include_devices:
+            listed = _run(['nvidia-smi', '-L'], want_stdout=False)
+            return {"devices": [], "cuda_version": None} if listed.returncode == 0 else None
+        nvidia_smi = _run(['nvidia-smi', '--query-gpu=name,driver_version,memory.total', '--format=csv,noheader'])
+        if nvidia_smi.returncode != 0:
+            return None
+        found = {
+            "devices": [line.strip() for line in nvidia_smi.stdout.strip().split('\n')],
+            "cuda_version": None
+        }
+
+        # Get CUDA version
+        cuda_check = _run(['nvcc', '--version'])
+        if cuda_check.returncode == 0:
+            for line in cuda_check.stdout.split('\n'):
+                if 'release' in line.lower():
+                    found["cuda_version"] = line.strip()
+                    break
+        return found
+    except (subprocess.TimeoutExpired, FileNotFoundError, subprocess.SubprocessError):
+        return None
 
-        if docker_version.returncode == 0:
-            result["available"] = True
-            result["version"] = docker_version.stdout.strip()
-
-            # Check docker-compose
-            compose_check = subprocess.run(
-                ['docker', 'compose', 'version'],
-                capture_output=True,
-                timeout=5
-            )
-            result["compose"] = compose_check.returncode == 0
-
-            # Check buildx
-            buildx_check = subprocess.run(
-                ['docker', 'buildx', 'version'],
-                capture_output=True,
-                timeout=5
-            )
-            result["buildx"] = buildx_check.returncode == 0
-
-            # Check network access (try to ping Docker Hub)
-            network_check = subprocess.run(
-                ['docker', 'pull', '--help'],
-                capture_output=True,
-                timeout=5
-            )
-            result["network"] = network_check.returncode == 0
 
+def _probe_amd() -> bool:
+    # Render nodes are shared with Intel GPUs, so rocm-smi still confirms the vendor
+    if os.name == "posix" and not glob.glob(AMD_RENDER_NODES):
+        return False
+    try:
+        rocm_check = _run(['rocm-smi', '--showproductname'], want_stdout=False)
+        return rocm_check.returncode == 0
     except (subprocess.TimeoutExpired, FileNotFoundError, subprocess.SubprocessError):
-        pass
+        return False
 
-    return result
+
+def _probe_apple_silicon() -> bool:
+    try:
+        import platform
+        return platform.system() == 'Darwin' and platform.processor() == 'arm'
+    except Exception:
+        return False
 
 
-def check_gpu() -> Dict:
-    """Check GPU availability (NVIDIA/AMD/Apple Silicon)."""
+def _gpu_probes(include_devices: bool = True) -> Dict[str, Callable]:
+    return {
+        "nvidia": functools.partial(_probe_nvidia, include_devices),
+        "amd": _probe_amd,
+        "apple_silicon": _probe_apple_silicon,
+    }
+
+
+def _gpu_result(probed: Dict) -> Dict:
     result = {
         "nvidia": False,
-        "amd": False,
-        "apple_silicon": False,
+        "amd": probed["amd"],
+        "apple_silicon": probed["apple_silicon"],
         "cuda_version": None,
         "devices": []
     }
+    if probed["nvidia"] is not None:
+        result["nvidia"] = True
+        result["devices"] = probed["nvidia"]["devices"]
+        result["cuda_version"] = probed["nvidia"]["cuda_version"]
+    return result
 
-    # Check NVIDIA GPU
-    try:
-        nvidia_smi = subprocess.run(
-            ['nvidia-smi', '--query-gpu=name,driver_version,memory.total', '--format=csv,noheader'],
-            capture_output=True,
-            text=True,
-            timeout=5
-        )
 
-        if nvidia_smi.returncode == 0:
-            result["nvidia"] = True
-            result["devices"] = [line.strip() for line in nvidia_smi.stdout.strip().split('\n')]
-
-            # Get CUDA version
-            cuda_check = subprocess.run(
-                ['nvcc', '--version'],
-                capture_output=True,
-                text=True,
-                timeout=5
-            )
-            if cuda_check.returncode == 0:
-                for line in cuda_check.stdout.split('\n'):
-                    if 'release' in line.lower():
-                        result["cuda_version"] = line.strip()
-                        break
-    except (subprocess.TimeoutExpired, FileNotFoundError, subprocess.SubprocessError):
-        pass
+@_memoized
+def check_gpu(include_devices: bool = True) -> Dict:
+    """Check GPU availability (NVIDIA/AMD/Apple Silicon).
+
+    Pass include_devices=False when only presence matters; NVIDIA is then confirmed
+    by nvidia-smi exiting cleanly and devices/cuda_version stay empty.
+    """
+    return _gpu_result(_run_probes(_gpu_probes(include_devices)))
 
-    # Check AMD GPU (rocm-smi)
-    try:
-        rocm_check = subprocess.run(
-            ['rocm-smi', '--showproductname'],
-            capture_output=True,
-            text=True,
-            timeout=5
-        )
-        result["amd"] = rocm_check.returncode == 0
-    except (subprocess.TimeoutExpired, FileNotFoundError, subprocess.SubprocessError):
-        pass
 
-    # Check Apple Silicon GPU
+def _probe_opencv() -> bool:
     try:
-        import platform
-        if platform.system() == 'Darwin' and platform.processor() == 'arm':
-            result["apple_silicon"] = True
-    except Exception:
-        pass
+        import cv2
+        return True
+    except ImportError:
+        return False
 
-    return result
 
+def _multimedia_probes() -> Dict[str, Callable]:
+    return {
+        "ffmpeg": lambda: _on_path("ffmpeg"),
+        "ffprobe": lambda: _on_path("ffprobe"),
+        "imagemagick": lambda: _on_path("convert"),
+        "opencv": _probe_opencv,
+    }
 
+
+@_memoized
 def check_multimedia_tools() -> Dict:
     """Check availability of multimedia processing tools."""
-    tools = {
-        "ffmpeg": shutil.which("ffmpeg") is not None,
-        "ffprobe": shutil.which("ffprobe") is not None,
-        "imagemagick": shutil.which("convert") is not None,
-        "opencv": False
-    }
+    return _run_probes(_multimedia_probes())
+
+
+LANGUAGE_CHECKS = {
+    "python": ["python", "--version"],
+    "python3": ["python3", "--version"],
+    "node": ["node", "--version"],
+    "npm": ["npm", "--version"],
+    "rust": ["rustc", "--version"],
+    "cargo": ["cargo", "--version"],
+    "go": ["go", "version"],
+    "java": ["java", "-version"],
+    "javac": ["javac", "-version"]
+}
+
 
-    # Check OpenCV (Python)
+def _probe_command_ok(cmd: List[str]) -> bool:
     try:
-        import cv2
-        tools["opencv"] = True
-    except ImportError:
+        result = _run(cmd, want_stdout=False)
+        return result.returncode == 0
+    except (subprocess.TimeoutExpired, FileNotFoundError, subprocess.SubprocessError):
+        return False
+
+
+def _probe_languages_batch() -> Dict[str, bool]:
+    """
+    Run every LANGUAGE_CHECKS command in one `sh -c`, echoing each exit status on its
+    own line; one fork instead of nine. Falls back to separate probes if the batch
+    times out or its output can't be parsed.
+    """
+    script = '; '.join(f'{shlex.join(cmd)} >/dev/null 2>&1; echo $?' for cmd in LANGUAGE_CHECKS.values())
+    try:
+        result = _run(['sh', '-c', script], timeout=10)
+        codes = result.stdout.split()
+        if len(codes) == len(LANGUAGE_CHECKS):
+            return {lang: code == '0' for lang, code in zip(LANGUAGE_CHECKS, codes)}
+    except (subprocess.TimeoutExpired, FileNotFoundError, subprocess.SubprocessError):
         pass
+    return {lang: _probe_command_ok(cmd) for lang, cmd in LANGUAGE_CHECKS.items()}
 
-    return tools
 
+def _language_probes() -> Dict[str, Callable]:
+    if os.name == 'posix':
+        return {"batch": _probe_languages_batch}
+    # No POSIX shell to batch in; presence on PATH is enough
+    return {lang: (lambda cmd=cmd: _on_path(cmd[0])) for lang, cmd in LANGUAGE_CHECKS.items()}
 
+
+def _language_result(probed: Dict) -> Dict:
+    return probed["batch"] if "batch" in probed else probed
+
+
+@_memoized
 def check_programming_languages() -> Dict:
     """Check available programming language runtimes."""
-    languages = {}
-
-    checks = {
-        "python": ["python", "--version"],
-        "python3": ["python3", "--version"],
-        "node": ["node", "--version"],
-        "npm": ["npm", "--version"],
-        "rust": ["rustc", "--version"],
-        "cargo": ["cargo", "--version"],
-        "go": ["go", "version"],
-        "java": ["java", "-version"],
-        "javac": ["javac", "-version"]
-    }
+    return _language_result(_run_probes(_language_probes()))
 
-    for lang, cmd in checks.items():
-        try:
-            result = subprocess.run(
-                cmd,
-                capture_output=True,
-                text=True,
-                timeout=5
-            )
-            languages[lang] = result.returncode == 0
-        except (subprocess.TimeoutExpired, FileNotFoundError, subprocess.SubprocessError):
-            languages[lang] = False
 
-    return languages
+def _security_probes() -> Dict[str, Callable]:
+    return {
+        "git": lambda: _on_path("git"),
+        "grep": lambda: _on_path("grep"),
+        "rg": lambda: _on_path("rg"),  # ripgrep for secrets
+        "trivy": lambda: _on_path("trivy"),  # container scanning
+        "syft": lambda: _on_path("syft"),  # SBOM generation
+        "grype": lambda: _on_path("grype"),  # vulnerability scanning
+    }
 
 
+@_memoized
 def check_security_tools() -> Dict:
     """Check availability of security scanning tools."""
-    tools = {
-        "git": shutil.which("git") is not None,
-        "grep": shutil.which("grep") is not None,
-        "rg": shutil.which("rg") is not None,  # ripgrep for secrets
-        "trivy": shutil.which("trivy") is not None,  # container scanning
-        "syft": shutil.which("syft") is not None,  # SBOM generation
-        "grype": shutil.which("grype") is not None,  # vulnerability scanning
-    }
+    return _run_probes(_security_probes())
 
-    return tools
 
+NETWORK_PROBE_TIMEOUT = 2.0  # seconds per target; all targets are probed concurrently
+NETWORK_TARGETS = {
+    # TCP to a public resolver's DNS port answers even where ICMP ping is filtered
+    "internet": ("8.8.8.8", 53),
+    # Check specific services (DNS lookup + TCP connect)
+    "github": ("github.com", 443),
+    "pypi": ("pypi.org", 443),
+    "npm_registry": ("registry.npmjs.org", 443),
+}
 
-def check_network_access() -> Dict:
-    """Check network connectivity and access."""
-    result = {
-        "internet": False,
-        "github": False,
-        "pypi": False,
-        "npm_registry": False
-    }
 
-    # Basic internet check (ping 8.8.8.8)
+async def _probe_tcp(host: str, port: int) -> bool:
     try:
-        ping_check = subprocess.run(
-            ['ping', '-c', '1', '-W', '2', '8.8.8.8'],
-            capture_output=True,
-            timeout=3
-        )
-        result["internet"] = ping_check.returncode == 0
-    except (subprocess.TimeoutExpired, FileNotFoundError, subprocess.SubprocessError):
+        _, writer = await asyncio.wait_for(asyncio.open_connection(host, port), NETWORK_PROBE_TIMEOUT)
+    except (OSError, asyncio.TimeoutError):
+        return False
+    writer.close()
+    try:
+        await writer.wait_closed()
+    except OSError:
         pass
+    return True
 
-    # Check specific services (DNS lookup)
-    services = {
-        "github": "github.com",
-        "pypi": "pypi.org",
-        "npm_registry": "registry.npmjs.org"
-    }
 
-    for service, host in services.items():
-        try:
-            dns_check = subprocess.run(
-                ['nslookup', host],
-                capture_output=True,
-                timeout=3
-            )
-            result[service] = dns_check.returncode == 0
-        except (subprocess.TimeoutExpired, FileNotFoundError, subprocess.SubprocessError):
-            pass
+async def _probe_tcp_all() -> List[bool]:
+    return await asyncio.gather(*(_probe_tcp(host, port) for host, port in NETWORK_TARGETS.values()))
 
-    return result
+
+def _probe_network_targets() -> Dict[str, bool]:
+    loop = asyncio.new_event_loop()
+    try:
+        reachable = loop.run_until_complete(_probe_tcp_all())
+    finally:
+        # Unlike asyncio.run(), close() doesn't wait for resolver threads stuck in DNS
+        loop.close()
+    return dict(zip(NETWORK_TARGETS, reachable))
+
+
+def _probe_network() -> Dict[str, bool]:
+    """Connect to every NETWORK_TARGETS entry at once with asyncio; no ping/nslookup forks."""
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return _probe_network_targets()
+    # Called from async code: this thread's loop is busy, so probe from another thread
+    with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
+        return executor.submit(_probe_network_targets).result()
 
 
+def _network_probes() -> Dict[str, Callable]:
+    return {"tcp": _probe_network}
+
+
+def _network_result(probed: Dict) -> Dict:
+    return probed["tcp"]
+
+
+@_memoized
+def check_network_access() -> Dict:
+    """Check network connectivity and access."""
+    return _network_result(_run_probes(_network_probes()))
+
+
+# section -> (probe table, assembler); assembler None means probe outputs are the result
+_SECTIONS = {
+    "docker": (_docker_probes, _docker_result),
+    "gpu": (_gpu_probes, _gpu_result),
+    "multimedia": (_multimedia_probes, None),
+    "languages": (_language_probes, _language_result),
+    "security": (_security_probes, None),
+    "network": (_network_probes, _network_result),
+}
+
+
+def _probe_all_parallel() -> Dict:
+    """Run every probe of every section concurrently and assemble the per-section dicts."""
+    tasks = [
+        (section, name, probe)
+        for section, (probes, _) in _SECTIONS.items()
+        for name, probe in probes().items()
+    ]
+    probed = {section: {} for section in _SECTIONS}
+    with concurrent.futures.ThreadPoolExecutor(max_workers=min(32, len(tasks))) as executor:
+        futures = {executor.submit(probe): (section, name) for section, name, probe in tasks}
+        for future in concurrent.futures.as_completed(futures):
+            section, name = futures[future]
+            probed[section][name] = future.result()
+
+    capabilities = {}
+    for section, (probes, assemble) in _SECTIONS.items():
+        # keep each section's keys in declaration order
+        ordered = {name: probed[section][name] for name in probes()}
+        capabilities[section] = assemble(ordered) if assemble else ordered
+    return capabilities
+
+
+CACHE_DIR = Path(os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache") / "aa3"
+DEFAULT_ENV_CACHE_TTL = 300  # seconds; override with AA3_ENV_CACHE_TTL (0 disables)
+
+
+def _env_cache_path() -> Path:
+    # Capabilities depend on the machine and on which binaries PATH exposes
+    key = hashlib.sha1((socket.gethostname() + os.environ.get("PATH", "")).encode()).hexdigest()[:16]
+    return CACHE_DIR / f"env_caps_{key}.json"
+
+
+def _disk_cached(fn):
+    """Serve fn()'s report from a JSON file while it is younger than the TTL; refresh=True bypasses it."""
+    @functools.wraps(fn)
+    def wrapper(refresh: bool = False) -> Dict:
+        try:
+            ttl = float(os.environ.get("AA3_ENV_CACHE_TTL", DEFAULT_ENV_CACHE_TTL))
+        except ValueError:
+            ttl = DEFAULT_ENV_CACHE_TTL
+        path = _env_cache_path()
+
+        if ttl > 0 and not refresh:
+            try:
+                if path.stat().st_mtime > time.time() - ttl:
+                    return json.loads(path.read_text(encoding="utf-8"))
+            except (OSError, ValueError):
+                pass  # missing/unreadable/corrupt cache: probe again
+
+        result = fn()
+
+        if ttl > 0:
+            try:
+                path.parent.mkdir(parents=True, exist_ok=True)
+                tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+                tmp.write_text(json.dumps(result), encoding="utf-8")
+                os.replace(tmp, path)  # atomic: readers never see a partial file
+            except OSError:
+                pass  # cache is best-effort
+        return result
+    return wrapper
+
+
+@_disk_cached
 def get_environment_capabilities() -> Dict:
     """
     Run all environment checks and return comprehensive capabilities report.
 
+    Cached on disk for AA3_ENV_CACHE_TTL seconds (default 300) per host and PATH;
+    pass refresh=True to force a new scan.
+
     Returns:
         Dict with keys: docker, gpu, multimedia, languages, security, network, summary
     """
-    capabilities = {
-        "docker": check_docker(),
-        "gpu": check_gpu(),
-        "multimedia": check_multimedia_tools(),
-        "languages": check_programming_languages(),
-        "security": check_security_tools(),
-        "network": check_network_access()
-    }
+    capabilities = _probe_all_parallel()
+    # Image pulls need outbound network, which the network probes already measure
+    capabilities["docker"]["network"] = capabilities["docker"]["available"] and capabilities["network"]["internet"]
 
     # Generate human-readable summary
     summary_lines = []
@@ -336,6 +604,8 @@ def generate_planner_context(capabilities: Dict) -> str:
             context_lines.append("  - Docker Compose: Can test multi-container setups")
         if capabilities["docker"]["buildx"]:
             context_lines.append("  - Buildx: Can test multi-platform builds")
+        if capabilities["docker"]["network"]:
+            context_lines.append("  - Registry access: Can pull base images")
 
     if capabilities["gpu"]["nvidia"]:
         context_lines.append(f"✓ NVIDIA GPU: {len(capabilities['gpu']['devices'])} device(s)")
@@ -363,11 +633,18 @@ def generate_planner_context(capabilities: Dict) -> str:
 
 if __name__ == "__main__":
     # CLI: Print environment report
+    import argparse
     import sys
 
+    ap = argparse.ArgumentParser(description="Scan environment capabilities for AAv3 planning")
+    ap.add_argument("--refresh", action="store_true", help="Ignore the cached report and re-probe")
+    args = ap.parse_args()
+    if args.refresh:
+        clear_check_caches()
+
     print("Scanning environment capabilities...\n")
 
-    caps = get_environment_capabilities()
+    caps = get_environment_capabilities(refresh=args.refresh)
 
     # Print summary
     print(caps["summary"])
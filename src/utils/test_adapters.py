@@ -5,11 +5,105 @@ GPU smoke tests and security scanning adapters to increase objective coverage.
 """
 
 import subprocess
+import base64
+import bisect
+import concurrent.futures
+import hashlib
+import importlib.metadata
+import mmap
+import os
 import re
+import shutil
+import threading
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Callable, Dict, List, Optional
 import json
 
+try:
+    import hyperscan
+except ImportError:
+    hyperscan = None
+
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+try:
+    from packaging.requirements import InvalidRequirement, Requirement
+except ImportError:
+    Requirement = None
+
+# GPU gating and the cache location (smoke-test sources and the compiled CUDA binary
+# persist there between runs) are shared with the environment probe
+try:
+    from .environment_check import CACHE_DIR, NVIDIA_DEVICE_NODES
+except ImportError:  # run as a script
+    from environment_check import CACHE_DIR, NVIDIA_DEVICE_NODES
+
+CUDA_TEST_CODE = """
+#include <stdio.h>
+
+__global__ void hello_cuda() {
+    printf("Hello from GPU thread %d\\n", threadIdx.x);
+}
+
+int main() {
+    hello_cuda<<<1, 1>>>();
+    cudaDeviceSynchronize();
+    return 0;
+}
+"""
+
+# Both frameworks are probed by one interpreter, which prints a JSON object mapping
+# framework -> {"ok": bool, "message": str} as its last line of stdout
+GPU_FRAMEWORKS_PROBE_CODE = """
+import json
+
+results = {}
+try:
+    import tensorflow as tf
+    gpus = tf.config.list_physical_devices('GPU')
+    results["tensorflow"] = {"ok": len(gpus) > 0,
+                             "message": f"TensorFlow {tf.__version__}: {len(gpus)} GPU(s) detected"}
+except Exception as e:
+    results["tensorflow"] = {"ok": False, "message": f"TensorFlow GPU test failed: {e}"}
+
+try:
+    import torch
+    cuda_available = torch.cuda.is_available()
+    device_count = torch.cuda.device_count() if cuda_available else 0
+    results["pytorch"] = {"ok": cuda_available,
+                          "message": f"PyTorch {torch.__version__}: CUDA={cuda_available}, {device_count} device(s)"}
+except Exception as e:
+    results["pytorch"] = {"ok": False, "message": f"PyTorch GPU test failed: {e}"}
+
+print(json.dumps(results))
+"""
+
+
+def _cache_dir(fallback: Path) -> Path:
+    """CACHE_DIR, or the given workspace when the cache can't be created."""
+    try:
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        return CACHE_DIR
+    except OSError:
+        return fallback
+
+
+def _cached_source(directory: Path, name: str, code: str) -> Path:
+    """Write a test source once; later calls reuse the file while its content matches."""
+    path = directory / name
+    try:
+        if path.read_text() == code:
+            return path
+    except OSError:
+        pass
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    tmp.write_text(code)
+    os.replace(tmp, path)  # atomic: a concurrent run never compiles or runs a partial source
+    return path
+
 
 class GPUSmokeTestAdapter:
     """
@@ -28,6 +122,10 @@ class GPUSmokeTestAdapter:
             "details": {}
         }
 
+        if os.name == "posix" and not any(os.path.exists(node) for node in NVIDIA_DEVICE_NODES):
+            results["details"]["nvidia_smi"] = "SKIPPED: no NVIDIA device node"
+            return results
+
         try:
             # Test 1: nvidia-smi availability
             nvidia_smi = subprocess.run(
@@ -64,34 +162,33 @@ class GPUSmokeTestAdapter:
 
             # Test 3: Simple CUDA program compilation (if nvcc available)
             if nvcc_version.returncode == 0:
-                cuda_test_file = workspace_dir / "gpu_test.cu"
-                cuda_test_code = """
-#include <stdio.h>
-
-__global__ void hello_cuda() {
-    printf("Hello from GPU thread %d\\n", threadIdx.x);
-}
-
-int main() {
-    hello_cuda<<<1, 1>>>();
-    cudaDeviceSynchronize();
-    return 0;
-}
-"""
-                cuda_test_file.write_text(cuda_test_code)
-
-                compile_result = subprocess.run(
-                    ['nvcc', str(cuda_test_file), '-o', str(workspace_dir / 'gpu_test')],
-                    capture_output=True,
-                    timeout=30
-                )
-
-                if compile_result.returncode == 0:
-                    results["details"]["cuda_compile"] = "PASS"
+                # The binary only changes with the toolkit or the source, so compile it once
+                # per (nvcc version, source) and reuse it from the cache afterwards
+                cache_key = hashlib.sha1((nvcc_version.stdout + CUDA_TEST_CODE).encode()).hexdigest()[:12]
+                build_dir = _cache_dir(workspace_dir)
+                cuda_binary = build_dir / f'gpu_test_{cache_key}'
+
+                if cuda_binary.exists():
+                    results["details"]["cuda_compile"] = "PASS (cached)"
+                    compiled = True
+                else:
+                    cuda_test_file = _cached_source(build_dir, "gpu_test.cu", CUDA_TEST_CODE)
+                    partial = build_dir / f'{cuda_binary.name}.{os.getpid()}.tmp'
+                    compile_result = subprocess.run(
+                        ['nvcc', str(cuda_test_file), '-o', str(partial)],
+                        capture_output=True,
+                        timeout=30
+                    )
+                    compiled = compile_result.returncode == 0
+                    if compiled:
+                        # publish atomically so a concurrent run never executes a half-written binary
+                        os.replace(partial, cuda_binary)
+                        results["details"]["cuda_compile"] = "PASS"
 
+                if compiled:
                     # Try to run it
                     run_result = subprocess.run(
-                        [str(workspace_dir / 'gpu_test')],
+                        [str(cuda_binary)],
                         capture_output=True,
                         text=True,
                         timeout=10
@@ -126,70 +223,392 @@ int main() {
             "details": {}
         }
 
-        # Test TensorFlow GPU
-        tf_test = workspace_dir / "test_tf_gpu.py"
-        tf_test_code = """
-import sys
-try:
-    import tensorflow as tf
-    gpus = tf.config.list_physical_devices('GPU')
-    print(f"TensorFlow {tf.__version__}: {len(gpus)} GPU(s) detected")
-    sys.exit(0 if len(gpus) > 0 else 1)
-except Exception as e:
-    print(f"TensorFlow GPU test failed: {e}")
-    sys.exit(1)
-"""
-        tf_test.write_text(tf_test_code)
-
+        # Test TensorFlow and PyTorch GPU in one interpreter, paying startup and
+        # shared imports (numpy, protobuf) once
         try:
-            tf_result = subprocess.run(
-                ['python', str(tf_test)],
+            probe_script = _cached_source(_cache_dir(workspace_dir), "probe_gpu_frameworks.py",
+                                          GPU_FRAMEWORKS_PROBE_CODE)
+            probe_result = subprocess.run(
+                ['python', str(probe_script)],
                 capture_output=True,
                 text=True,
-                timeout=30
+                timeout=60
             )
+            frameworks = json.loads(probe_result.stdout.strip().splitlines()[-1])
+        except Exception as e:
+            results["details"]["tensorflow_gpu"] = f"ERROR: {e}"
+            results["details"]["pytorch_gpu"] = f"ERROR: {e}"
+            return results
 
-            if tf_result.returncode == 0:
-                results["details"]["tensorflow_gpu"] = f"PASS: {tf_result.stdout.strip()}"
+        for framework, key in (("tensorflow", "tensorflow_gpu"), ("pytorch", "pytorch_gpu")):
+            probe = frameworks[framework]
+            if probe["ok"]:
+                results["details"][key] = f"PASS: {probe['message']}"
                 results["passed"] = True
             else:
-                results["details"]["tensorflow_gpu"] = f"NOT AVAILABLE: {tf_result.stdout.strip()}"
-        except Exception as e:
-            results["details"]["tensorflow_gpu"] = f"ERROR: {e}"
+                results["details"][key] = f"NOT AVAILABLE: {probe['message']}"
+
+        return results
 
-        # Test PyTorch GPU
-        torch_test = workspace_dir / "test_torch_gpu.py"
-        torch_test_code = """
-import sys
-try:
-    import torch
-    cuda_available = torch.cuda.is_available()
-    device_count = torch.cuda.device_count() if cuda_available else 0
-    print(f"PyTorch {torch.__version__}: CUDA={cuda_available}, {device_count} device(s)")
-    sys.exit(0 if cuda_available else 1)
-except Exception as e:
-    print(f"PyTorch GPU test failed: {e}")
-    sys.exit(1)
-"""
-        torch_test.write_text(torch_test_code)
 
+# Common secret patterns
+SECRET_PATTERNS = {
+    "AWS Access Key": r'AKIA[0-9A-Z]{16}',
+    "AWS Secret Key": r'aws(.{0,20})?[\'"][0-9a-zA-Z/+]{40}[\'"]',
+    "GitHub Token": r'gh[pousr]_[0-9a-zA-Z]{36}',
+    "Generic API Key": r'api[_-]?key["\']?\s*[:=]\s*["\']?[0-9a-zA-Z]{20,}',
+    "Generic Secret": r'secret["\']?\s*[:=]\s*["\']?[0-9a-zA-Z]{20,}',
+    "Private Key": r'-----BEGIN (RSA|DSA|EC|OPENSSH) PRIVATE KEY-----',
+    "Password in code": r'password["\']?\s*[:=]\s*["\'][^"\']{8,}["\']',
+}
+
+# One precompiled regex per pattern, all run over every file that hits, so text matched
+# by several patterns (e.g. an AKIA key assigned to api_key) is reported under each.
+# Compiled for bytes so file contents are scanned without decoding them first.
+_SECRET_TYPES = list(SECRET_PATTERNS)
+_SECRET_RES = [re.compile(regex.encode(), re.IGNORECASE) for regex in SECRET_PATTERNS.values()]
+# Every pattern fused into one alternation: a single pass that only decides whether a
+# file holds any secret at all (it matches wherever some pattern does), so clean files
+# never pay for the per-pattern passes.
+_SECRET_RE = re.compile(
+    b'|'.join(b'(?:' + regex.pattern + b')' for regex in _SECRET_RES),
+    re.IGNORECASE
+)
+
+# Default scan set: extensions matched by the '**/*<ext>' default patterns, directories
+# that only hold vendored or generated code, and a size cap that skips data dumps.
+SCAN_EXTENSIONS = ('.py', '.js', '.json', '.yaml', '.yml', '.env')
+SKIP_DIRS = frozenset({'.git', 'node_modules', 'venv', '.venv', '__pycache__', 'dist', 'build'})
+MAX_SCAN_BYTES = 2_000_000
+
+# Below this many files a process pool costs more to start than it saves
+PARALLEL_SCAN_MIN_FILES = 200
+
+
+def _compile_hyperscan_prefilter():
+    """Hyperscan database over SECRET_PATTERNS, or None when unavailable/unsupported."""
+    if hyperscan is None:
+        return None
+    try:
+        db = hyperscan.Database()
+        db.compile(
+            expressions=[regex.encode() for regex in SECRET_PATTERNS.values()],
+            ids=list(range(len(SECRET_PATTERNS))),
+            flags=[hyperscan.HS_FLAG_CASELESS] * len(SECRET_PATTERNS)
+        )
+        return db
+    except Exception:
+        return None
+
+
+# Hyperscan only answers "does this file contain any secret" (SIMD, no backtracking);
+# files that hit are then reported by _SECRET_RES so the output format is unchanged.
+_HS_PREFILTER = _compile_hyperscan_prefilter()
+
+
+def _hyperscan_hit(data: bytes) -> bool:
+    hit = []
+
+    def on_match(pattern_id, start, end, flags, context):
+        hit.append(pattern_id)
+        return True  # stop scanning at the first match
+
+    try:
         try:
-            torch_result = subprocess.run(
-                ['python', str(torch_test)],
-                capture_output=True,
-                text=True,
-                timeout=30
-            )
+            _HS_PREFILTER.scan(data, match_event_handler=on_match)
+        except TypeError:
+            # builds that only take bytes can't scan an mmap in place
+            _HS_PREFILTER.scan(bytes(data), match_event_handler=on_match)
+    except hyperscan.ScanTerminated:
+        pass
+    return bool(hit)
+
+
+_NEWLINE_RE = re.compile(rb'\n')
+
+
+def _newline_offsets(content, end: int) -> List[int]:
+    """Offsets of every newline before end; matches are then numbered by bisecting this."""
+    return [m.start() for m in _NEWLINE_RE.finditer(content, 0, end)]
+
+
+def _find_secrets(content, rel_path: str) -> List[Dict]:
+    """All secret matches in one file (bytes or mmap), ordered by pattern then position."""
+    if _SECRET_RE.search(content) is None:
+        return []
+    matches = [(i, match) for i, regex in enumerate(_SECRET_RES) for match in regex.finditer(content)]
+    # Newlines past the last match can't affect any line number
+    newlines = _newline_offsets(content, max(match.start() for _, match in matches))
+    found = []
+    for i, match in matches:
+        text = match.group().decode('utf-8', errors='ignore')
+        found.append({
+            "type": _SECRET_TYPES[i],
+            "file": rel_path,
+            "line": bisect.bisect_left(newlines, match.start()) + 1,
+            "snippet": text[:50] + "..." if len(text) > 50 else text
+        })
+    return found
+
+
+def _iter_scan_files(workspace_dir: Path, file_patterns: List[str]):
+    """
+    Yield (path, relative path) for each file to scan.
+
+    '**/*<ext>' patterns are served by one os.walk that prunes SKIP_DIRS in place;
+    anything else falls back to one Path.glob per pattern.
+    """
+    if all(pattern.startswith('**/*') and '/' not in pattern[3:] and '*' not in pattern[4:]
+           for pattern in file_patterns):
+        suffixes = tuple(pattern[4:] for pattern in file_patterns)
+        for root, dirs, files in os.walk(workspace_dir):
+            dirs[:] = [d for d in dirs if d not in SKIP_DIRS]
+            rel_root = os.path.relpath(root, workspace_dir)
+            for name in files:
+                if name.endswith(suffixes):
+                    yield os.path.join(root, name), name if rel_root == '.' else os.path.join(rel_root, name)
+        return
+
+    for pattern in file_patterns:
+        for file_path in workspace_dir.glob(pattern):
+            if file_path.is_file():
+                yield str(file_path), str(file_path.relative_to(workspace_dir))
+
+
+def _scan_content(content, rel_path: str) -> List[Dict]:
+    if _HS_PREFILTER is not None and not _hyperscan_hit(content):
+        return []
+    return _find_secrets(content, rel_path)
+
+
+def _scan_files(files: List[tuple]) -> tuple:
+    """
+    Scan (path, relative path) pairs; returns (secrets_found, files_scanned).
+
+    On POSIX files are mmap'd and the bytes regex runs over the mapped pages,
+    so no copy of the file is made in Python.
+    """
+    found = []
+    scanned = 0
+    for file_path, rel_path in files:
+        try:
+            size = os.stat(file_path).st_size
+            if size >= MAX_SCAN_BYTES:
+                continue
+            scanned += 1
+            if size == 0:
+                continue  # nothing to find, and mmap rejects empty files
+            with open(file_path, 'rb') as f:
+                if os.name == 'posix':
+                    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as content:
+                        found.extend(_scan_content(content, rel_path))
+                else:
+                    found.extend(_scan_content(f.read(), rel_path))
 
-            if torch_result.returncode == 0:
-                results["details"]["pytorch_gpu"] = f"PASS: {torch_result.stdout.strip()}"
-                results["passed"] = True
-            else:
-                results["details"]["pytorch_gpu"] = f"NOT AVAILABLE: {torch_result.stdout.strip()}"
         except Exception as e:
-            results["details"]["pytorch_gpu"] = f"ERROR: {e}"
+            pass  # Skip files that can't be read
+    return found, scanned
 
-        return results
+
+def _scan_files_parallel(files: List[tuple]) -> tuple:
+    """
+    Shard the file list across a process pool (cpu_count - 2 workers).
+
+    The regex scan holds the GIL, so threads wouldn't help. Shards are contiguous
+    and merged in order, giving the same report as a serial scan.
+    """
+    workers = max(1, (os.cpu_count() or 1) - 2)
+    if workers == 1 or len(files) < PARALLEL_SCAN_MIN_FILES:
+        return _scan_files(files)
+
+    # A few shards per worker keeps cores busy when file sizes are uneven
+    size = -(-len(files) // (workers * 4))
+    shards = [files[i:i + size] for i in range(0, len(files), size)]
+    try:
+        with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as executor:
+            parts = list(executor.map(_scan_files, shards))
+    except (OSError, concurrent.futures.process.BrokenProcessPool):
+        return _scan_files(files)
+
+    found = []
+    scanned = 0
+    for part_found, part_scanned in parts:
+        found.extend(part_found)
+        scanned += part_scanned
+    return found, scanned
+
+
+def _rg_path(path: Dict) -> str:
+    """Path from an rg --json record: {"text": ...}, or {"bytes": <base64>} when not UTF-8."""
+    if "text" in path:
+        return path["text"]
+    return os.fsdecode(base64.b64decode(path["bytes"]))
+
+
+def _scan_with_ripgrep(workspace_dir: Path, file_patterns: List[str]):
+    """
+    Let ripgrep pick the files that contain any secret, then scan those whole files
+    with _scan_files.
+
+    ripgrep walks and searches in parallel with a DFA engine. It runs in --multiline
+    mode (so '\\s*' may span newlines) and --text mode (binary files are searched),
+    with Unicode disabled so it matches raw bytes like the bytes regexes do; the
+    report itself always comes from the Python matcher. Returns
+    (secrets_found, files_scanned), or None when rg can't handle the request so the
+    caller falls back to the Python scan.
+    """
+    # rg globs match at any depth, which is only equivalent for '**/' patterns
+    if not all(pattern.startswith('**/') for pattern in file_patterns):
+        return None
+
+    cmd = ['rg', '--json', '--multiline', '--text', '--max-count', '1', '--ignore-case',
+           '--hidden', '--no-ignore', '--no-messages']
+    # rg skips files larger than N; the Python scan skips N = MAX_SCAN_BYTES and up
+    cmd += ['--max-filesize', str(MAX_SCAN_BYTES - 1)]
+    for pattern in file_patterns:
+        cmd += ['--glob', pattern]
+    for skip_dir in SKIP_DIRS:
+        cmd += ['--glob', f'!{skip_dir}']
+    for regex in SECRET_PATTERNS.values():
+        cmd += ['-e', f'(?-u){regex}']
+    cmd.append(str(workspace_dir))
+
+    try:
+        rg = subprocess.run(cmd, capture_output=True, timeout=120)
+    except (subprocess.TimeoutExpired, FileNotFoundError, subprocess.SubprocessError):
+        return None
+    # 0 = matches, 1 = no matches, 2 = error (e.g. a pattern rg's engine rejects)
+    if rg.returncode not in (0, 1):
+        return None
+
+    candidates = {}
+    files_scanned = 0
+    for line in rg.stdout.splitlines():
+        record = json.loads(line)
+        if record["type"] == "summary":
+            files_scanned = record["data"]["stats"]["searches"]
+        elif record["type"] == "match":
+            path = _rg_path(record["data"]["path"])
+            candidates.setdefault(path, os.path.relpath(path, workspace_dir))
+
+    # rg reports files in completion order; sort for a stable report
+    found, _ = _scan_files(sorted(candidates.items(), key=lambda item: item[1]))
+    return found, files_scanned
+
+
+def _json_items(cmd: List[str], prefix: str, extract: Callable, timeout: float) -> Optional[List]:
+    """
+    Run cmd and return extract(item) for each item at the ijson-style prefix
+    (e.g. 'matches.item') of its JSON stdout, or None if it exits non-zero.
+
+    With ijson the output is parsed while the tool is still writing it, so only
+    the extracted fields are ever held; otherwise stdout is buffered and json.loads'd.
+    Empty or malformed output from a zero exit raises ValueError naming the tool.
+    """
+    if ijson is None:
+        result = subprocess.run(cmd, capture_output=True, text=True, timeout=timeout)
+        if result.returncode != 0:
+            return None
+        if not result.stdout.strip():
+            raise ValueError(f"{cmd[0]}: empty output")
+        try:
+            data = json.loads(result.stdout)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"{cmd[0]}: malformed JSON output: {e}") from e
+        for key in prefix.split('.')[:-1]:
+            data = data.get(key) or []
+        return [extract(item) for item in data]
+
+    timed_out = []
+    error = None
+
+    def kill(proc):
+        timed_out.append(True)
+        proc.kill()
+
+    with subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL) as proc:
+        timer = threading.Timer(timeout, kill, args=(proc,))
+        timer.start()
+        try:
+            items = [extract(item) for item in ijson.items(proc.stdout, prefix)]
+            # Discard whatever follows the items so the tool can't block on a full pipe
+            while proc.stdout.read(1 << 16):
+                pass
+            returncode = proc.wait()
+        except ijson.JSONError as e:
+            # A tool that failed before writing JSON is reported by its exit status
+            error = e
+            while proc.stdout.read(1 << 16):
+                pass
+            returncode = proc.wait()
+        finally:
+            timer.cancel()
+    if timed_out:
+        raise subprocess.TimeoutExpired(cmd, timeout)
+    if returncode != 0:
+        return None
+    if error is not None:
+        raise ValueError(f"{cmd[0]}: malformed JSON output: {error}") from error
+    return items
+
+
+def _installed_python_packages() -> List[Dict]:
+    """Name/version of every distribution visible to this interpreter, like `pip list`."""
+    packages = {}
+    for dist in importlib.metadata.distributions():
+        name = dist.metadata["Name"]
+        # the first entry on sys.path wins, as it does for imports
+        if name and name.lower() not in packages:
+            packages[name.lower()] = {"name": name, "version": dist.version}
+    return [packages[key] for key in sorted(packages)]
+
+
+_REQUIREMENT_NAME_RE = re.compile(r'^\s*([A-Za-z0-9][A-Za-z0-9._-]*)\s*(?:\[[^\]]*\])?\s*([^;#]*)')
+
+
+def _parse_requirements(requirements_file: Path) -> List[Dict]:
+    """name/specifier pairs from a requirements file; options and includes are skipped."""
+    parsed = []
+    for line in requirements_file.read_text(errors='ignore').splitlines():
+        line = line.split(' #', 1)[0].strip()
+        if not line or line.startswith(('#', '-')):
+            continue
+        if Requirement is not None:
+            try:
+                req = Requirement(line)
+            except InvalidRequirement:
+                continue
+            parsed.append({"name": req.name, "specifier": str(req.specifier)})
+            continue
+        match = _REQUIREMENT_NAME_RE.match(line)
+        if match:
+            parsed.append({"name": match.group(1), "specifier": match.group(2).strip()})
+    return parsed
+
+
+def _workspace_venv_python(workspace_dir: Path) -> Optional[Path]:
+    """The interpreter of a virtualenv inside the workspace, if it has one."""
+    for venv in ("venv", ".venv"):
+        if (workspace_dir / venv / "pyvenv.cfg").exists():
+            for python in ("bin/python", "Scripts/python.exe"):
+                if (workspace_dir / venv / python).exists():
+                    return workspace_dir / venv / python
+    return None
+
+
+def _sbom_artifact(artifact: Dict) -> Dict:
+    return {"name": artifact.get("name"), "version": artifact.get("version"), "type": artifact.get("type")}
+
+
+def _grype_match(match: Dict) -> Dict:
+    vulnerability = match.get("vulnerability", {})
+    artifact = match.get("artifact", {})
+    return {
+        "id": vulnerability.get("id"),
+        "severity": vulnerability.get("severity", "unknown"),
+        "package": artifact.get("name"),
+        "version": artifact.get("version")
+    }
 
 
 class SecurityScanAdapter:
@@ -202,7 +621,10 @@ class SecurityScanAdapter:
         """
         Scan for exposed secrets (API keys, passwords, tokens).
 
-        Uses patterns to detect common secret types.
+        Uses patterns to detect common secret types. Skips SKIP_DIRS and files of
+        MAX_SCAN_BYTES or more. Delegates to ripgrep when it
+        is installed; otherwise scans in Python, skipping files a Hyperscan
+        prefilter (if available) finds clean.
         """
         results = {
             "test_name": "Secrets Detection",
@@ -211,45 +633,17 @@ class SecurityScanAdapter:
             "files_scanned": 0
         }
 
-        # Common secret patterns
-        secret_patterns = {
-            "AWS Access Key": r'AKIA[0-9A-Z]{16}',
-            "AWS Secret Key": r'aws(.{0,20})?[\'"][0-9a-zA-Z/+]{40}[\'"]',
-            "GitHub Token": r'gh[pousr]_[0-9a-zA-Z]{36}',
-            "Generic API Key": r'api[_-]?key["\']?\s*[:=]\s*["\']?[0-9a-zA-Z]{20,}',
-            "Generic Secret": r'secret["\']?\s*[:=]\s*["\']?[0-9a-zA-Z]{20,}',
-            "Private Key": r'-----BEGIN (RSA|DSA|EC|OPENSSH) PRIVATE KEY-----',
-            "Password in code": r'password["\']?\s*[:=]\s*["\'][^"\']{8,}["\']',
-        }
-
         if file_patterns is None:
             # Default: scan Python, JS, config files
-            file_patterns = ['**/*.py', '**/*.js', '**/*.json', '**/*.yaml', '**/*.yml', '**/*.env']
-
-        for pattern in file_patterns:
-            for file_path in workspace_dir.glob(pattern):
-                if file_path.is_file():
-                    results["files_scanned"] += 1
-
-                    try:
-                        content = file_path.read_text(encoding='utf-8', errors='ignore')
+            file_patterns = [f'**/*{ext}' for ext in SCAN_EXTENSIONS]
 
-                        for secret_type, regex in secret_patterns.items():
-                            matches = re.finditer(regex, content, re.IGNORECASE)
-
-                            for match in matches:
-                                # Get line number
-                                line_num = content[:match.start()].count('\n') + 1
-
-                                results["secrets_found"].append({
-                                    "type": secret_type,
-                                    "file": str(file_path.relative_to(workspace_dir)),
-                                    "line": line_num,
-                                    "snippet": match.group()[:50] + "..." if len(match.group()) > 50 else match.group()
-                                })
-
-                    except Exception as e:
-                        pass  # Skip files that can't be read
+        rg_results = _scan_with_ripgrep(workspace_dir, file_patterns) if shutil.which('rg') else None
+        if rg_results is not None:
+            results["secrets_found"], results["files_scanned"] = rg_results
+        else:
+            results["secrets_found"], results["files_scanned"] = _scan_files_parallel(
+                list(_iter_scan_files(workspace_dir, file_patterns))
+            )
 
         if results["secrets_found"]:
             results["passed"] = False
@@ -264,7 +658,7 @@ class SecurityScanAdapter:
         """
         Generate Software Bill of Materials (SBOM).
 
-        Tries multiple methods: syft, pip freeze, npm list, etc.
+        Tries multiple methods: syft, Python package metadata, npm list, etc.
         """
         results = {
             "test_name": "SBOM Generation",
@@ -273,38 +667,50 @@ class SecurityScanAdapter:
             "method": None
         }
 
-        # Try syft (best option if available)
+        # Try syft (best option if available); only each artifact's identity is kept
         try:
-            syft_result = subprocess.run(
+            artifacts = _json_items(
                 ['syft', 'dir:' + str(workspace_dir), '-o', 'json'],
-                capture_output=True,
-                text=True,
-                timeout=60
+                'artifacts.item', _sbom_artifact, timeout=60
             )
 
-            if syft_result.returncode == 0:
-                results["sbom"] = json.loads(syft_result.stdout)
+            if artifacts is not None:
+                results["sbom"] = {"artifacts": artifacts}
                 results["method"] = "syft"
                 results["passed"] = True
                 return results
-        except (FileNotFoundError, subprocess.SubprocessError, json.JSONDecodeError):
-            pass
+            syft_error = "syft exited with an error"
+        except FileNotFoundError:
+            syft_error = None  # not installed
+        except subprocess.TimeoutExpired:
+            syft_error = "syft timed out after 60s"
+        except (subprocess.SubprocessError, ValueError) as e:
+            syft_error = f"syft failed: {e}"
 
-        # Fallback: Python dependencies
+        # Fallback: Python dependencies. Declared requirements are parsed directly and
+        # installed packages read from distribution metadata; pip only runs for a
+        # virtualenv inside the workspace, which this interpreter can't see into.
         requirements_file = workspace_dir / "requirements.txt"
         if requirements_file.exists():
             try:
-                pip_list = subprocess.run(
-                    ['pip', 'list', '--format=json'],
-                    capture_output=True,
-                    text=True,
-                    timeout=30
-                )
-
-                if pip_list.returncode == 0:
-                    results["sbom"]["python_packages"] = json.loads(pip_list.stdout)
-                    results["method"] = "pip list"
+                results["sbom"]["python_requirements"] = _parse_requirements(requirements_file)
+                venv_python = _workspace_venv_python(workspace_dir)
+                if venv_python is None:
+                    results["sbom"]["python_packages"] = _installed_python_packages()
+                    results["method"] = "importlib.metadata"
                     results["passed"] = True
+                else:
+                    pip_list = subprocess.run(
+                        [str(venv_python), '-m', 'pip', 'list', '--format=json'],
+                        capture_output=True,
+                        text=True,
+                        timeout=30
+                    )
+
+                    if pip_list.returncode == 0:
+                        results["sbom"]["python_packages"] = json.loads(pip_list.stdout)
+                        results["method"] = "pip list"
+                        results["passed"] = True
             except Exception:
                 pass
 
@@ -328,7 +734,10 @@ class SecurityScanAdapter:
                 pass
 
         if not results["passed"]:
-            results["message"] = "No SBOM generation tool available (install syft for best results)"
+            if syft_error is not None:
+                results["message"] = f"SBOM generation failed: {syft_error}"
+            else:
+                results["message"] = "No SBOM generation tool available (install syft for best results)"
 
         return results
 
@@ -344,24 +753,25 @@ class SecurityScanAdapter:
             "method": None
         }
 
-        # Try grype (works with SBOM or direct scanning)
+        # Failures of scanners that are installed, reported instead of "not available"
+        errors = []
+
+        # Try grype (works with SBOM or direct scanning); matches are reduced to
+        # id/severity/package as they stream in
         try:
-            grype_result = subprocess.run(
+            matches = _json_items(
                 ['grype', 'dir:' + str(workspace_dir), '-o', 'json'],
-                capture_output=True,
-                text=True,
-                timeout=120
+                'matches.item', _grype_match, timeout=120
             )
 
-            if grype_result.returncode == 0:
-                grype_data = json.loads(grype_result.stdout)
-                results["vulnerabilities"] = grype_data.get("matches", [])
+            if matches is not None:
+                results["vulnerabilities"] = matches
                 results["method"] = "grype"
 
                 # Count by severity
                 severity_counts = {}
                 for vuln in results["vulnerabilities"]:
-                    severity = vuln.get("vulnerability", {}).get("severity", "unknown")
+                    severity = vuln["severity"]
                     severity_counts[severity] = severity_counts.get(severity, 0) + 1
 
                 results["severity_breakdown"] = severity_counts
@@ -372,10 +782,14 @@ class SecurityScanAdapter:
                     results["message"] = f"Found {len(results['vulnerabilities'])} vulnerabilities"
 
                 return results
+            errors.append("grype exited with an error")
 
-        except (FileNotFoundError, subprocess.SubprocessError, json.JSONDecodeError):
-            results["message"] = "No vulnerability scanner available (install grype)"
-            pass
+        except FileNotFoundError:
+            pass  # not installed
+        except subprocess.TimeoutExpired:
+            errors.append("grype timed out after 120s")
+        except (subprocess.SubprocessError, ValueError) as e:
+            errors.append(f"grype failed: {e}")
 
         # Fallback: pip-audit for Python
         try:
@@ -387,7 +801,8 @@ class SecurityScanAdapter:
                 cwd=str(workspace_dir)
             )
 
-            if pip_audit.returncode == 0:
+            # exit status 1 only means vulnerabilities were found; the report is still written
+            if pip_audit.stdout.strip():
                 audit_data = json.loads(pip_audit.stdout)
                 results["vulnerabilities"] = audit_data.get("dependencies", [])
                 results["method"] = "pip-audit"
@@ -395,11 +810,21 @@ class SecurityScanAdapter:
                 if results["vulnerabilities"]:
                     results["passed"] = False
 
-            return results
+                return results
+            errors.append(f"pip-audit exited with status {pip_audit.returncode} and no output")
 
-        except (FileNotFoundError, subprocess.SubprocessError, json.JSONDecodeError):
-            pass
+        except FileNotFoundError:
+            pass  # not installed
+        except subprocess.TimeoutExpired:
+            errors.append("pip-audit timed out after 60s")
+        except (subprocess.SubprocessError, ValueError) as e:
+            errors.append(f"pip-audit failed: {e}")
 
+        if errors:
+            results["errors"] = errors
+            results["message"] = "Vulnerability scan failed: " + "; ".join(errors)
+        else:
+            results["message"] = "No vulnerability scanner available (install grype)"
         return results
 
 
@@ -426,9 +851,79 @@ def run_gpu_smoke_tests(workspace_dir: Path) -> Dict:
     return results
 
 
+# Files that give syft/grype (or the pip/npm fallbacks) something to inventory, at any depth
+DEPENDENCY_MANIFESTS = (
+    "requirements.txt", "pyproject.toml", "setup.py", "Pipfile", "poetry.lock",
+    "package.json", "package-lock.json", "yarn.lock", "go.mod", "Cargo.toml",
+    "Gemfile", "pom.xml", "build.gradle", "composer.json", "Dockerfile",
+)
+
+# Installed packages and archives syft/grype catalog without any manifest: vendored
+# site-packages/venvs (*.dist-info, *.egg-info), Java archives, wheels, gems, ...
+PACKAGE_DIR_SUFFIXES = (".dist-info", ".egg-info")
+PACKAGE_FILE_SUFFIXES = (".jar", ".war", ".ear", ".whl", ".egg", ".gem", ".nupkg", ".exe", ".dll")
+
+# Leading bytes of executables syft reads build info from (Go and Rust binaries):
+# ELF, Mach-O (32/64-bit, both byte orders, universal) and PE
+EXECUTABLE_MAGICS = (b"\x7fELF", b"\xfe\xed\xfa\xce", b"\xfe\xed\xfa\xcf",
+                     b"\xce\xfa\xed\xfe", b"\xcf\xfa\xed\xfe", b"\xca\xfe\xba\xbe", b"MZ")
+
+# Directories the manifest search visits before giving up and running the scans anyway
+MANIFEST_SEARCH_MAX_DIRS = 5000
+
+
+def _is_executable_binary(path: str) -> bool:
+    try:
+        if not os.access(path, os.X_OK):
+            return False
+        with open(path, 'rb') as f:
+            return f.read(4).startswith(EXECUTABLE_MAGICS)
+    except OSError:
+        return False
+
+
+def _has_dependency_manifest(workspace_dir: Path) -> bool:
+    """
+    True if anything syft/grype can inventory exists anywhere under workspace_dir: a
+    DEPENDENCY_MANIFESTS file (nested ones are cataloged too), an installed-package
+    directory or archive (PACKAGE_DIR_SUFFIXES, PACKAGE_FILE_SUFFIXES), or an
+    executable binary. The walk stops at the first hit; past MANIFEST_SEARCH_MAX_DIRS
+    directories it answers True so a scan is never skipped just because the tree was
+    too large to search.
+    """
+    manifests = frozenset(DEPENDENCY_MANIFESTS)
+    for visited, (root, dirs, files) in enumerate(os.walk(workspace_dir), 1):
+        if not manifests.isdisjoint(files):
+            return True
+        if any(d.endswith(PACKAGE_DIR_SUFFIXES) for d in dirs):
+            return True
+        if any(f.lower().endswith(PACKAGE_FILE_SUFFIXES) for f in files):
+            return True
+        if any(_is_executable_binary(os.path.join(root, f)) for f in files):
+            return True
+        if visited >= MANIFEST_SEARCH_MAX_DIRS:
+            return True
+        dirs[:] = [d for d in dirs if d != '.git']
+    return False
+
+
+def _workspace_fingerprint(workspace_dir: Path) -> Dict:
+    """Cheap checks for which scans have any input; the file walk stops at the first hit."""
+    default_patterns = [f'**/*{ext}' for ext in SCAN_EXTENSIONS]
+    return {
+        "scannable_files": next(_iter_scan_files(workspace_dir, default_patterns), None) is not None,
+        "dependency_manifests": _has_dependency_manifest(workspace_dir),
+    }
+
+
+def _skipped(test_name: str, reason: str) -> Dict:
+    return {"test_name": test_name, "passed": True, "skipped": True, "message": f"Skipped: {reason}"}
+
+
 def run_security_scans(workspace_dir: Path) -> Dict:
-    """Run all security scans."""
+    """Run all security scans, skipping the ones whose inputs the workspace lacks."""
     sec_adapter = SecurityScanAdapter()
+    fingerprint = _workspace_fingerprint(workspace_dir)
 
     results = {
         "test_suite": "Security Scans",
@@ -436,16 +931,24 @@ def run_security_scans(workspace_dir: Path) -> Dict:
     }
 
     # Secrets scan
-    secrets_result = sec_adapter.scan_for_secrets(workspace_dir)
+    if fingerprint["scannable_files"]:
+        secrets_result = sec_adapter.scan_for_secrets(workspace_dir)
+    else:
+        secrets_result = _skipped("Secrets Detection", "no source or config files in workspace")
     results["tests"].append(secrets_result)
 
-    # SBOM generation
-    sbom_result = sec_adapter.generate_sbom(workspace_dir)
-    results["tests"].append(sbom_result)
-
-    # Vulnerability scan
-    vuln_result = sec_adapter.scan_for_vulnerabilities(workspace_dir)
-    results["tests"].append(vuln_result)
+    if fingerprint["dependency_manifests"]:
+        # SBOM generation
+        sbom_result = sec_adapter.generate_sbom(workspace_dir)
+        results["tests"].append(sbom_result)
+
+        # Vulnerability scan
+        vuln_result = sec_adapter.scan_for_vulnerabilities(workspace_dir)
+        results["tests"].append(vuln_result)
+    else:
+        reason = "no dependency manifest, installed package or binary in workspace"
+        results["tests"].append(_skipped("SBOM Generation", reason))
+        results["tests"].append(_skipped("Vulnerability Scanning", reason))
 
     # Overall: pass if no secrets and no high/critical vulns
     results["passed"] = all(
@@ -0,0 +1,179 @@
+"""
+Shared fixtures for the AAv2 test suite.
+
+The simple task and its execution transcript are built once per session; every
+test that needs an executor run reuses them instead of re-running the pipeline.
+
+Commands run through the executor's in-process backend against a temp workspace
+(AAV2_INPROCESS=1); export AAV2_INPROCESS=0 to exercise the agent-sandbox instead.
+"""
+import hashlib, os, pickle, subprocess, sys
+from pathlib import Path
+
+import pytest
+
+# Add parent to path
+ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT))
+
+# Sources whose content keys the --aav2-cache transcript cache
+EXECUTOR_SOURCES = ("scripts/aav2_executor.py", "scripts/aav2_artifacts.py", "scripts/execute_blocks.py")
+
+# Task files used across the suite (as bytes, written verbatim once per session by name)
+TASK_CASES = {
+    "simple": b"""
+# Test Task
+
+EXECUTE:
+mkdir -p /workspace/test
+echo "Hello AAv2" > /workspace/test/hello.txt
+cat /workspace/test/hello.txt
+
+SUCCESS_CRITERIA:
+File exists: /workspace/test/hello.txt
+grep: Hello AAv2 in /workspace/test/hello.txt
+""",
+    "fail": b"""
+# Failing Task
+
+EXECUTE:
+ls /nonexistent_directory
+cat /missing_file.txt
+
+SUCCESS_CRITERIA:
+File exists: /workspace/output.txt
+""",
+    "empty": b"""
+# Empty Task
+
+No EXECUTE block here.
+""",
+    "malformed": b"""
+EXECUTE:
+echo "test"
+
+SUCCESS_CRITERIA:
+This is not a valid criterion format
+""",
+}
+
+
+def _task_path(fixtures_dir: Path, name: str) -> Path:
+    path = fixtures_dir / f"test_{name}.md"
+    if not path.exists():
+        path.write_bytes(TASK_CASES[name])
+    return path
+
+
+def pytest_addoption(parser):
+    parser.addoption("--aav2-cache", action="store_true",
+                     help="Reuse the simple-task executor transcript and the workspace files it produced "
+                          "from .pytest_cache while the task file and executor sources are unchanged "
+                          "(in-process backend only)")
+    parser.addoption("--slow", action="store_true",
+                     help="Also run tests marked slow (real multi-agent runs); implied by -m slow")
+
+
+def pytest_collection_modifyitems(config, items):
+    if config.getoption("--slow") or "slow" in (config.getoption("markexpr") or ""):
+        return
+    skip = pytest.mark.skip(reason="slow: pass --slow (or -m slow) to run")
+    for item in items:
+        if "slow" in item.keywords:
+            item.add_marker(skip)
+
+
+@pytest.fixture(scope="session", autouse=True)
+def command_backend(tmp_path_factory):
+    """Default execute_task to the in-process backend with a temp /workspace"""
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setenv("AAV2_INPROCESS", os.environ.get("AAV2_INPROCESS", "1"))
+        mp.setenv("AAV2_WORKSPACE_ROOT", str(tmp_path_factory.mktemp("aav2_workspace")))
+        yield "inprocess" if os.environ["AAV2_INPROCESS"] == "1" else "sandbox"
+
+
+def _sandbox_running() -> bool:
+    try:
+        ps = subprocess.run(["docker", "ps", "--filter", "name=agent-sandbox", "--format", "{{.Names}}"],
+                            capture_output=True, text=True, timeout=10)
+    except (OSError, subprocess.SubprocessError):
+        return False
+    return "agent-sandbox" in ps.stdout
+
+
+@pytest.fixture(scope="session")
+def sandbox(command_backend):
+    """Skip the requesting test if it runs on the sandbox backend and agent-sandbox is not running"""
+    if command_backend == "sandbox" and not _sandbox_running():
+        pytest.skip("agent-sandbox container not running (run scripts/start_agent_sandbox.sh)")
+
+
+@pytest.fixture(scope="session")
+def fixtures_dir(tmp_path_factory):
+    """Per-session directory for generated task files"""
+    return tmp_path_factory.mktemp("aav2_fixtures")
+
+
+@pytest.fixture(scope="session")
+def outputs_dir(tmp_path_factory):
+    """Per-session directory for artifacts (set TMPDIR=/dev/shm to keep it on tmpfs)"""
+    return tmp_path_factory.mktemp("aav2_outputs")
+
+
+@pytest.fixture(scope="session")
+def task_file(request, fixtures_dir):
+    """TASK_CASES entry as a file; select with parametrize("task_file", [name], indirect=True)"""
+    return _task_path(fixtures_dir, request.param)
+
+
+@pytest.fixture(scope="session")
+def simple_task(fixtures_dir):
+    """Task file with 3 commands and 2 success criteria"""
+    return _task_path(fixtures_dir, "simple")
+
+
+def _snapshot_workspace(root: Path) -> dict:
+    """Workspace contents as {relative path: bytes, or None for a directory}"""
+    return {p.relative_to(root).as_posix(): None if p.is_dir() else p.read_bytes()
+            for p in sorted(root.rglob("*"))}
+
+
+def _restore_workspace(root: Path, files: dict) -> None:
+    """Replay a _snapshot_workspace result into root (parents sort before children)"""
+    for rel, data in files.items():
+        path = root / rel
+        if data is None:
+            path.mkdir(parents=True, exist_ok=True)
+        else:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_bytes(data)
+
+
+@pytest.fixture(scope="session")
+def simple_transcript(request, simple_task, sandbox, outputs_dir, command_backend):
+    """(transcript, transcript_path) from one executor run of the simple task"""
+    from scripts.aav2_executor import execute_task
+    from scripts.aav2_artifacts import save_artifact
+
+    cache = None
+    # The sandbox's /workspace lives in the container, so only in-process runs can be replayed
+    if request.config.getoption("--aav2-cache") and command_backend == "inprocess":
+        # conftest itself is keyed too: it defines the cached (transcript, files) layout
+        h = hashlib.sha256(command_backend.encode() + simple_task.read_bytes() + Path(__file__).read_bytes())
+        for src in EXECUTOR_SOURCES:
+            h.update((ROOT / src).read_bytes())
+        cache = request.config.cache.mkdir("aav2") / f"{h.hexdigest()}.pkl"
+
+    workspace = Path(os.environ["AAV2_WORKSPACE_ROOT"])
+    if cache is not None and cache.exists():
+        transcript, files = pickle.loads(cache.read_bytes())
+        _restore_workspace(workspace, files)
+    else:
+        transcript = execute_task(str(simple_task), agent_id="test_executor", enable_reflection=False)
+        assert transcript is not None, "Executor returned None"
+        if cache is not None:
+            cache.write_bytes(pickle.dumps((transcript, _snapshot_workspace(workspace))))
+
+    transcript_path = outputs_dir / "test_executor_transcript.json"
+    save_artifact(transcript, str(transcript_path))
+    return transcript, transcript_path
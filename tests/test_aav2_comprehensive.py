@@ -1,4 +1,3 @@
-#!/usr/bin/env python3
 """
 AAv2 Comprehensive Test Suite - Life-Critical System Validation
 
@@ -8,445 +7,319 @@ Tests:
 3. Safety tests (reflection pattern blocks dangerous commands)
 4. Edge case tests (failures, retries, etc.)
 5. Artifact validation (structured output correctness)
+
+Run with: pytest tests/test_aav2_comprehensive.py
+CI (fail fast, previous failures first): pytest --ff -x tests/
+Iterating on a red run: pytest --lf tests/  (add --aav2-cache to skip re-executing)
+In parallel (pytest-xdist): pytest -n auto tests/  - session fixtures are built
+once per worker and every worker gets its own temp dirs.
+Real end-to-end runs are marked slow and skipped by default: pytest --slow (or -m slow).
+Shared fixtures (simple_task, simple_transcript, task_file, outputs_dir) and the
+TASK_CASES task files live in tests/conftest.py; generated files go to pytest temp
+dirs, not the source tree.
 """
-import sys, os, json, subprocess
+import shutil, sys, time, warnings
 from pathlib import Path
 
+import pytest
+
 # Add parent to path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from scripts.execute_blocks import parse_task
 from scripts.aav2_artifacts import load_artifact
 
+_TRANSCRIPT_REQUIRED = frozenset({"artifact_type", "task_file", "agent_id", "commands_executed",
+                                  "total_commands", "successful_commands", "failed_commands"})
 
-class TestResult:
-    def __init__(self):
-        self.passed = []
-        self.failed = []
-        self.warnings = []
-
-    def add_pass(self, test_name: str, details: str = ""):
-        self.passed.append((test_name, details))
-        print(f"[PASS] {test_name}")
-        if details:
-            print(f"       {details}")
-
-    def add_fail(self, test_name: str, reason: str):
-        self.failed.append((test_name, reason))
-        print(f"[FAIL] {test_name}")
-        print(f"       Reason: {reason}")
-
-    def add_warn(self, test_name: str, warning: str):
-        self.warnings.append((test_name, warning))
-        print(f"[WARN] {test_name}")
-        print(f"       Warning: {warning}")
 
-    def summary(self):
-        total = len(self.passed) + len(self.failed)
-        print(f"\n{'='*60}")
-        print(f"TEST SUMMARY")
-        print(f"{'='*60}")
-        print(f"Total tests: {total}")
-        print(f"Passed: {len(self.passed)} ({100*len(self.passed)/total if total > 0 else 0:.1f}%)")
-        print(f"Failed: {len(self.failed)}")
-        print(f"Warnings: {len(self.warnings)}")
+# ============================================================
+# UNIT TESTS
+# ============================================================
 
-        if self.failed:
-            print(f"\nFAILED TESTS:")
-            for name, reason in self.failed:
-                print(f"  - {name}: {reason}")
-
-        return len(self.failed) == 0
-
-
-def test_parse_execute_blocks(results: TestResult):
+def test_parse_execute_blocks(simple_task):
     """Test: Parse task files correctly"""
-    print(f"\n--- Test: Parse EXECUTE blocks ---")
-
-    # Create test task
-    test_task = Path("tests/fixtures/test_simple.md")
-    test_task.parent.mkdir(parents=True, exist_ok=True)
-    test_task.write_text("""
-# Test Task
-
-EXECUTE:
-mkdir -p /workspace/test
-echo "Hello AAv2" > /workspace/test/hello.txt
-cat /workspace/test/hello.txt
+    parsed = parse_task(str(simple_task))
 
-SUCCESS_CRITERIA:
-File exists: /workspace/test/hello.txt
-grep: Hello AAv2 in /workspace/test/hello.txt
-""")
+    assert len(parsed["commands"]) == 3, f"Expected 3 commands, got {len(parsed['commands'])}"
+    assert len(parsed["criteria"]) == 2, f"Expected 2 criteria, got {len(parsed['criteria'])}"
 
-    try:
-        parsed = parse_task(str(test_task))
 
-        # Validate commands
-        if len(parsed["commands"]) != 3:
-            results.add_fail("parse_execute_blocks", f"Expected 3 commands, got {len(parsed['commands'])}")
-            return
-
-        # Validate criteria
-        if len(parsed["criteria"]) != 2:
-            results.add_fail("parse_execute_blocks", f"Expected 2 criteria, got {len(parsed['criteria'])}")
-            return
-
-        results.add_pass("parse_execute_blocks", f"Parsed {len(parsed['commands'])} commands, {len(parsed['criteria'])} criteria")
-
-    except Exception as e:
-        results.add_fail("parse_execute_blocks", str(e))
-
-
-def test_executor_agent(results: TestResult):
+def test_executor_agent(simple_transcript):
     """Test: Executor agent runs commands"""
-    print(f"\n--- Test: Executor Agent ---")
-
-    test_task = Path("tests/fixtures/test_simple.md")
-    if not test_task.exists():
-        results.add_fail("executor_agent", "Test task file missing")
-        return
-
-    try:
-        from scripts.aav2_executor import execute_task
-
-        transcript = execute_task(
-            task_file=str(test_task),
-            agent_id="test_executor",
-            enable_reflection=False
-        )
-
-        if transcript is None:
-            results.add_fail("executor_agent", "Executor returned None")
-            return
-
-        # Validate transcript
-        if transcript.total_commands != 3:
-            results.add_fail("executor_agent", f"Expected 3 commands, executed {transcript.total_commands}")
-            return
+    transcript, _ = simple_transcript
 
-        if transcript.failed_commands > 0:
-            results.add_fail("executor_agent", f"{transcript.failed_commands} commands failed")
-            return
+    assert transcript.total_commands == 3, f"Expected 3 commands, executed {transcript.total_commands}"
+    assert transcript.failed_commands == 0, f"{transcript.failed_commands} commands failed"
 
-        results.add_pass("executor_agent", f"Executed {transcript.successful_commands}/{transcript.total_commands} commands successfully")
 
-    except Exception as e:
-        results.add_fail("executor_agent", str(e))
+DANGEROUS = [
+    ("rm -rf /", "Should block filesystem deletion"),
+    ("dd if=/dev/zero of=/dev/sda", "Should block disk wipe"),
+    (":(){ :|:& };:", "Should block fork bomb"),
+    ("> /dev/sda", "Should block direct block device write"),
+]
 
 
-def test_reflection_safety(results: TestResult):
+@pytest.mark.parametrize("cmd,reason", DANGEROUS,
+                         ids=["rm-rf-root", "dd-disk-wipe", "fork-bomb", "blockdev-write"])
+def test_reflection_safety(cmd, reason):
     """Test: Reflection pattern blocks dangerous commands"""
-    print(f"\n--- Test: Reflection Safety ---")
-
     from scripts.aav2_executor import reflect_on_command
 
-    dangerous_commands = [
-        ("rm -rf /", "Should block filesystem deletion"),
-        ("dd if=/dev/zero of=/dev/sda", "Should block disk wipe"),
-        (":(){ :|:& };:", "Should block fork bomb"),
-        ("> /dev/sda", "Should block direct block device write")
-    ]
-
-    blocked_count = 0
-    for cmd, reason in dangerous_commands:
-        reflection = reflect_on_command(cmd)
-        if not reflection.proceed:
-            blocked_count += 1
-            print(f"  [OK] Blocked: {cmd[:50]}")
-        else:
-            results.add_warn("reflection_safety", f"Did not block dangerous command: {cmd}")
-
-    if blocked_count >= len(dangerous_commands) * 0.75:  # At least 75% blocked
-        results.add_pass("reflection_safety", f"Blocked {blocked_count}/{len(dangerous_commands)} dangerous commands")
-    else:
-        results.add_fail("reflection_safety", f"Only blocked {blocked_count}/{len(dangerous_commands)} dangerous commands")
+    reflection = reflect_on_command(cmd)
+    assert not reflection.proceed, reason
 
 
-def test_reflection_alternatives(results: TestResult):
+def test_reflection_alternatives():
     """Test: Reflection suggests alternatives for problematic commands"""
-    print(f"\n--- Test: Reflection Alternatives ---")
-
     from scripts.aav2_executor import reflect_on_command
 
     # Test mkdir on file-like path
     reflection = reflect_on_command("mkdir /workspace/test.txt")
 
-    if not reflection.proceed and reflection.alternative_command:
-        results.add_pass("reflection_alternatives", f"Suggested: {reflection.alternative_command}")
-    else:
-        results.add_fail("reflection_alternatives", "Did not suggest alternative for mkdir on file-like path")
-
+    assert not reflection.proceed and reflection.alternative_command, \
+        "Did not suggest alternative for mkdir on file-like path"
 
-def test_verifier_agent(results: TestResult):
-    """Test: Verifier checks success criteria"""
-    print(f"\n--- Test: Verifier Agent ---")
-
-    # First run executor to get transcript
-    test_task = Path("tests/fixtures/test_simple.md")
-    transcript_path = Path("tests/outputs/test_executor_transcript.json")
-    transcript_path.parent.mkdir(parents=True, exist_ok=True)
 
-    try:
-        from scripts.aav2_executor import execute_task
-        from scripts.aav2_verifier import verify_criteria
-        from scripts.aav2_artifacts import save_artifact
+@pytest.mark.parametrize("cmd", [
+    "mkdir /tmp/x > /dev/sdb; touch /workspace/out.txt",
+    "mkdir /workspace/a.b; rm -rf /",
+], ids=["blockdev-write", "rm-rf-root"])
+def test_reflection_dangerous_before_alternatives(cmd):
+    """Test: Dangerous commands are blocked even when another heuristic has an alternative"""
+    from scripts.aav2_executor import reflect_on_command
 
-        # Execute task
-        transcript = execute_task(str(test_task), agent_id="test_exec_for_verify", enable_reflection=False)
-        if transcript is None or transcript.failed_commands > 0:
-            results.add_fail("verifier_agent", "Executor failed, cannot test verifier")
-            return
+    reflection = reflect_on_command(cmd)
+    assert not reflection.proceed and reflection.risk_level == "high", "Dangerous command not blocked"
+    assert reflection.alternative_command is None, "Offered an alternative for a dangerous command"
 
-        # Save transcript
-        save_artifact(transcript, str(transcript_path))
 
-        # Verify criteria
-        report = verify_criteria(
-            task_file=str(test_task),
-            transcript_path=str(transcript_path),
-            agent_id="test_verifier"
-        )
+@pytest.mark.parametrize("cmd,blocked", [
+    ("bomb(){ bomb|bomb& };bomb", True),
+    ("f() { f | f & }; f", True),
+    ("f() { echo hi; }; f", False),
+    ("ls | grep x &", False),
+], ids=["named-fork-bomb", "spaced-fork-bomb", "plain-function", "background-pipe"])
+def test_reflection_fork_bomb(cmd, blocked):
+    """Test: The fork-bomb pattern matches self-piping functions only"""
+    from scripts.aav2_executor import reflect_on_command
 
-        if report is None:
-            results.add_fail("verifier_agent", "Verifier returned None")
-            return
+    assert reflect_on_command(cmd).proceed is not blocked
 
-        if report.overall_pass:
-            results.add_pass("verifier_agent", f"Passed {report.passed_criteria}/{report.total_criteria} criteria")
-        else:
-            results.add_fail("verifier_agent", f"Only {report.passed_criteria}/{report.total_criteria} criteria passed")
 
-    except Exception as e:
-        results.add_fail("verifier_agent", str(e))
+@pytest.mark.parametrize("cmd", [
+    "echo pwned > ../escaped.txt",
+    "echo x > /workspace/../escaped2.txt",
+    "cat /workspace/../../../etc/hostname",
+    "mkdir -p /workspace/../escaped_dir",
+], ids=["relative-dotdot", "workspace-dotdot", "cat-outside", "mkdir-outside"])
+def test_inprocess_stays_in_workspace(cmd):
+    """Test: In-process backend never touches host paths outside the workspace root"""
+    from scripts.aav2_executor import run_command_inprocess
 
+    assert run_command_inprocess(cmd) is None, f"In-process backend handled an escaping path: {cmd}"
 
-def test_reviewer_agent(results: TestResult):
-    """Test: Reviewer diagnoses failures"""
-    print(f"\n--- Test: Reviewer Agent ---")
 
-    # Create failing task
-    fail_task = Path("tests/fixtures/test_fail.md")
-    fail_task.write_text("""
-# Failing Task
+@pytest.mark.parametrize("cmd,stdout", [
+    ("ls /workspace/a/b.txt", "/workspace/a/b.txt\n"),
+    ("ls a/b.txt", "a/b.txt\n"),
+    ("ls a", "b.txt\n"),
+    ("ls a a/b.txt", None),
+], ids=["absolute-file", "relative-file", "directory", "several-operands"])
+def test_inprocess_ls_matches_coreutils(cmd, stdout, tmp_path, monkeypatch):
+    """Test: In-process ls echoes file operands as given and defers multi-operand listings"""
+    from scripts.aav2_executor import run_command_inprocess
 
-EXECUTE:
-ls /nonexistent_directory
-cat /missing_file.txt
+    (tmp_path / "a").mkdir()
+    (tmp_path / "a" / "b.txt").write_text("x")
+    monkeypatch.setenv("AAV2_WORKSPACE_ROOT", str(tmp_path))
+    monkeypatch.chdir(tmp_path)
+    result = run_command_inprocess(cmd)
+    assert (result and result["stdout"]) == stdout
 
-SUCCESS_CRITERIA:
-File exists: /workspace/output.txt
-""")
 
-    try:
-        from scripts.aav2_executor import execute_task
-        from scripts.aav2_verifier import verify_criteria
-        from scripts.aav2_reviewer import review_failures
-        from scripts.aav2_artifacts import save_artifact
+def test_verifier_agent(simple_task, simple_transcript):
+    """Test: Verifier checks success criteria"""
+    from scripts.aav2_verifier import verify_criteria
 
-        # Execute (should fail)
-        transcript = execute_task(str(fail_task), agent_id="test_exec_fail", enable_reflection=False)
-        transcript_path = Path("tests/outputs/test_fail_transcript.json")
-        save_artifact(transcript, str(transcript_path))
+    transcript, _ = simple_transcript
+    assert transcript.failed_commands == 0, "Executor failed, cannot test verifier"
 
-        # Verify (should fail)
-        report = verify_criteria(str(fail_task), str(transcript_path), agent_id="test_verify_fail")
-        report_path = Path("tests/outputs/test_fail_report.json")
-        save_artifact(report, str(report_path))
+    report = verify_criteria(
+        task_file=str(simple_task),
+        agent_id="test_verifier",
+        transcript_obj=transcript
+    )
 
-        # Review
-        diagnosis = review_failures(str(transcript_path), str(report_path), agent_id="test_reviewer")
+    assert report is not None, "Verifier returned None"
+    assert report.overall_pass, f"Only {report.passed_criteria}/{report.total_criteria} criteria passed"
 
-        if diagnosis is None:
-            results.add_fail("reviewer_agent", "Reviewer returned None")
-            return
 
-        if diagnosis.total_failures > 0:
-            results.add_pass("reviewer_agent", f"Diagnosed {diagnosis.total_failures} failures ({diagnosis.fixable_failures} fixable)")
-        else:
-            results.add_warn("reviewer_agent", "No failures diagnosed (expected at least 1)")
+@pytest.mark.parametrize("task_file", ["fail"], indirect=True)
+def test_reviewer_agent(task_file, outputs_dir):
+    """Test: Reviewer diagnoses failures"""
+    from scripts.aav2_pipeline import run_pipeline
+    from scripts.aav2_reviewer import review_failures
+
+    # Execute + verify (should fail); the reviewer reads the artifacts from disk
+    transcript, report = run_pipeline(str(task_file), "test_fail", persist=True,
+                                      artifacts_dir=str(outputs_dir), enable_reflection=False)
+    assert report is not None, "Pipeline returned no report"
+    transcript_path = outputs_dir / f"{transcript.agent_id}_transcript.json"
+    report_path = outputs_dir / f"{report.agent_id}_report.json"
+
+    # Review
+    diagnosis = review_failures(str(transcript_path), str(report_path), agent_id="test_reviewer")
+
+    assert diagnosis is not None, "Reviewer returned None"
+    if diagnosis.total_failures == 0:
+        warnings.warn("No failures diagnosed (expected at least 1)")
+
+
+# ============================================================
+# INTEGRATION TESTS
+# ============================================================
+
+def _fake_execute_task(task_file, agent_id=None, enable_reflection=True, command_backend=None):
+    """Canned successful ExecutionTranscript (stands in for execute_task)"""
+    from scripts.aav2_artifacts import ExecutionTranscript, timestamp_now
+    return ExecutionTranscript(
+        task_file=task_file, agent_id=agent_id, commands_executed=[],
+        total_commands=3, successful_commands=3, failed_commands=0,
+        total_duration_sec=0.0, timestamp_start=timestamp_now(), timestamp_end=timestamp_now()
+    )
+
+
+def _fake_verify_criteria(task_file, transcript_path=None, agent_id=None, transcript_obj=None):
+    """Canned passing VerificationReport (stands in for verify_criteria)"""
+    from scripts.aav2_artifacts import VerificationReport, timestamp_now
+    return VerificationReport(
+        transcript_id=str(transcript_path), agent_id=agent_id, criteria_checked=[],
+        total_criteria=2, passed_criteria=2, failed_criteria=0,
+        overall_pass=True, timestamp=timestamp_now()
+    )
+
+
+@pytest.mark.parametrize("real", [False, pytest.param(True, marks=pytest.mark.slow)], ids=["fake", "real"])
+def test_orchestrator_integration(real, request, monkeypatch, simple_task, outputs_dir):
+    """Test: Full orchestrator workflow (fake agents by default, real ones with --slow)"""
+    from scripts.aav2_orchestrator import AAv2Orchestrator
+
+    if real:
+        request.getfixturevalue("sandbox")
+    else:
+        monkeypatch.setattr("scripts.aav2_orchestrator.execute_task", _fake_execute_task)
+        monkeypatch.setattr("scripts.aav2_orchestrator.verify_criteria", _fake_verify_criteria)
 
-    except Exception as e:
-        results.add_fail("reviewer_agent", str(e))
+    orchestrator = AAv2Orchestrator(
+        task_file=str(simple_task),
+        max_rounds=2,
+        artifacts_dir=str(outputs_dir / f"orchestrator_{'real' if real else 'fake'}")
+    )
 
+    synthesis = orchestrator.run()
 
-def test_orchestrator_integration(results: TestResult):
-    """Test: Full orchestrator workflow"""
-    print(f"\n--- Test: Orchestrator Integration ---")
+    # Validate synthesis
+    assert synthesis.final_status == "complete", f"Task not complete: {synthesis.final_status}"
+    assert synthesis.metrics["executors_spawned"] >= 1, "No executors spawned"
+    assert synthesis.metrics["verifiers_spawned"] >= 1, "No verifiers spawned"
 
-    test_task = Path("tests/fixtures/test_simple.md")
 
-    try:
-        from scripts.aav2_orchestrator import AAv2Orchestrator
+def test_artifact_structure(simple_transcript):
+    """Test: Artifacts have correct structure"""
+    _, transcript_path = simple_transcript
+    assert transcript_path.exists(), f"Transcript not saved: {transcript_path}"
 
-        orchestrator = AAv2Orchestrator(
-            task_file=str(test_task),
-            max_rounds=2,
-            artifacts_dir="tests/outputs/orchestrator"
-        )
+    transcript = load_artifact(str(transcript_path))
 
-        synthesis = orchestrator.run()
+    # Validate required fields
+    missing = _TRANSCRIPT_REQUIRED - transcript.keys()
+    assert not missing, f"Missing fields: {sorted(missing)}"
+    assert transcript["artifact_type"] == "execution_transcript", \
+        f"Wrong artifact type: {transcript['artifact_type']}"
 
-        # Validate synthesis
-        if synthesis.final_status != "complete":
-            results.add_fail("orchestrator_integration", f"Task not complete: {synthesis.final_status}")
-            return
 
-        if synthesis.metrics["executors_spawned"] < 1:
-            results.add_fail("orchestrator_integration", "No executors spawned")
-            return
+def test_save_artifact_async(simple_transcript, outputs_dir):
+    """Test: Concurrent async saves write the same JSON as save_artifact"""
+    import asyncio
+    from scripts.aav2_artifacts import save_artifact_async
 
-        if synthesis.metrics["verifiers_spawned"] < 1:
-            results.add_fail("orchestrator_integration", "No verifiers spawned")
-            return
+    transcript, transcript_path = simple_transcript
+    paths = [outputs_dir / f"async_{i}_transcript.json" for i in range(2)]
 
-        results.add_pass("orchestrator_integration",
-                        f"Complete in {synthesis.execution_rounds} rounds, "
-                        f"{synthesis.metrics['total_agents']} agents, "
-                        f"{synthesis.metrics['artifacts_generated']} artifacts")
+    async def save_all():
+        await asyncio.gather(*(save_artifact_async(transcript, str(p)) for p in paths))
 
-    except Exception as e:
-        results.add_fail("orchestrator_integration", str(e))
+    asyncio.run(save_all())
+    for p in paths:
+        assert load_artifact(str(p)) == load_artifact(str(transcript_path))
 
 
-def test_artifact_structure(results: TestResult):
-    """Test: Artifacts have correct structure"""
-    print(f"\n--- Test: Artifact Structure ---")
+# ============================================================
+# EDGE CASE TESTS
+# ============================================================
 
-    artifacts_dir = Path("tests/outputs")
+@pytest.mark.parametrize("task_file", ["empty"], indirect=True)
+def test_edge_case_empty_task(task_file):
+    """Test: Handle empty task gracefully"""
+    with pytest.raises(ValueError, match="No EXECUTE: block found"):
+        parse_task(str(task_file))
 
-    if not artifacts_dir.exists():
-        results.add_warn("artifact_structure", "No artifacts directory found")
-        return
 
-    # Find transcript
-    transcripts = list(artifacts_dir.glob("**/test_executor_transcript.json"))
-    if not transcripts:
-        results.add_warn("artifact_structure", "No transcripts found")
-        return
+@pytest.mark.parametrize("task_file", ["malformed"], indirect=True)
+def test_edge_case_malformed_criteria(task_file):
+    """Test: Handle malformed criteria gracefully"""
+    from scripts.aav2_pipeline import run_pipeline
 
-    try:
-        transcript = load_artifact(str(transcripts[0]))
+    transcript, report = run_pipeline(str(task_file), "test_malformed", enable_reflection=False)
 
-        # Validate required fields
-        required = ["artifact_type", "task_file", "agent_id", "commands_executed",
-                   "total_commands", "successful_commands", "failed_commands"]
+    # Should handle gracefully (0 criteria)
+    assert report is not None, "Verifier returned None"
+    if report.total_criteria != 0:
+        warnings.warn("Parsed malformed criteria (might be ok)")
 
-        missing = [f for f in required if f not in transcript]
-        if missing:
-            results.add_fail("artifact_structure", f"Missing fields: {missing}")
-            return
 
-        if transcript["artifact_type"] != "execution_transcript":
-            results.add_fail("artifact_structure", f"Wrong artifact type: {transcript['artifact_type']}")
-            return
+@pytest.fixture
+def local_sandbox(tmp_path, monkeypatch):
+    """Run `docker exec ... agent-sandbox bash -c` scripts with the local bash in tmp_path"""
+    import subprocess
+    from scripts import aav2_executor
 
-        results.add_pass("artifact_structure", "Transcript structure valid")
+    if shutil.which("bash") is None or shutil.which("timeout") is None:
+        pytest.skip("needs bash and coreutils timeout")
+    real_run = subprocess.run
 
-    except Exception as e:
-        results.add_fail("artifact_structure", str(e))
+    def run(argv, **kwargs):
+        assert argv[:5] == ["docker", "exec", "-w", "/workspace", "agent-sandbox"], argv
+        return real_run(argv[5:], cwd=tmp_path, **kwargs)
 
+    monkeypatch.setattr(aav2_executor, "_sandbox_missing", lambda start_time: None)
+    monkeypatch.setattr(aav2_executor.subprocess, "run", run)
+    return tmp_path
 
-def test_edge_case_empty_task(results: TestResult):
-    """Test: Handle empty task gracefully"""
-    print(f"\n--- Test: Edge Case - Empty Task ---")
 
-    empty_task = Path("tests/fixtures/test_empty.md")
-    empty_task.write_text("""
-# Empty Task
+def test_batch_commands_do_not_share_shell_state(local_sandbox):
+    """Test: Batched commands start fresh, like separate docker exec runs"""
+    from scripts.aav2_executor import run_commands_in_sandbox
 
-No EXECUTE block here.
-""")
+    results = list(run_commands_in_sandbox(
+        ["cd / && export AAV2_X=1 && set -o noglob", "pwd; echo \"x=$AAV2_X\"; set -o | grep noglob", "echo \"it's\""]
+    ))
 
-    try:
-        parsed = parse_task(str(empty_task))
-        results.add_fail("edge_case_empty", "Should have raised error for missing EXECUTE block")
-    except ValueError as e:
-        if "No EXECUTE: block found" in str(e):
-            results.add_pass("edge_case_empty", "Correctly rejected empty task")
-        else:
-            results.add_fail("edge_case_empty", f"Wrong error: {e}")
-    except Exception as e:
-        results.add_fail("edge_case_empty", f"Unexpected error: {e}")
+    assert [r["returncode"] for r in results] == [0, 0, 0]
+    assert results[1]["stdout"].splitlines()[:2] == [str(local_sandbox), "x="], results[1]["stdout"]
+    assert "off" in results[1]["stdout"].splitlines()[2], "Shell options leaked between commands"
+    assert results[2]["stdout"] == "it's\n"
 
 
-def test_edge_case_malformed_criteria(results: TestResult):
-    """Test: Handle malformed criteria gracefully"""
-    print(f"\n--- Test: Edge Case - Malformed Criteria ---")
-
-    malformed = Path("tests/fixtures/test_malformed.md")
-    malformed.write_text("""
-EXECUTE:
-echo "test"
-
-SUCCESS_CRITERIA:
-This is not a valid criterion format
-""")
-
-    try:
-        from scripts.aav2_executor import execute_task
-        from scripts.aav2_verifier import verify_criteria
-        from scripts.aav2_artifacts import save_artifact
-
-        transcript = execute_task(str(malformed), agent_id="test_malformed", enable_reflection=False)
-        transcript_path = Path("tests/outputs/test_malformed_transcript.json")
-        save_artifact(transcript, str(transcript_path))
-
-        report = verify_criteria(str(malformed), str(transcript_path), agent_id="test_verify_malformed")
-
-        # Should handle gracefully (0 criteria)
-        if report.total_criteria == 0:
-            results.add_pass("edge_case_malformed", "Gracefully handled malformed criteria")
-        else:
-            results.add_warn("edge_case_malformed", "Parsed malformed criteria (might be ok)")
-
-    except Exception as e:
-        results.add_fail("edge_case_malformed", str(e))
-
-
-def run_all_tests():
-    """Run complete test suite"""
-    print("="*60)
-    print("AAv2 COMPREHENSIVE TEST SUITE - Life-Critical System")
-    print("="*60)
-
-    results = TestResult()
-
-    # Unit tests
-    print("\n" + "="*60)
-    print("UNIT TESTS")
-    print("="*60)
-    test_parse_execute_blocks(results)
-    test_executor_agent(results)
-    test_reflection_safety(results)
-    test_reflection_alternatives(results)
-    test_verifier_agent(results)
-    test_reviewer_agent(results)
-
-    # Integration tests
-    print("\n" + "="*60)
-    print("INTEGRATION TESTS")
-    print("="*60)
-    test_orchestrator_integration(results)
-    test_artifact_structure(results)
-
-    # Edge cases
-    print("\n" + "="*60)
-    print("EDGE CASE TESTS")
-    print("="*60)
-    test_edge_case_empty_task(results)
-    test_edge_case_malformed_criteria(results)
-
-    # Summary
-    success = results.summary()
-
-    if success:
-        print("\n[SUCCESS] All tests passed - system is safe to use")
-        return 0
-    else:
-        print("\n[FAILURE] Some tests failed - DO NOT use system until fixed")
-        return 1
+def test_batch_command_timeout(local_sandbox):
+    """Test: Each batched command gets its own timeout; later commands don't run"""
+    from scripts.aav2_executor import run_commands_in_sandbox
 
+    start = time.monotonic()
+    results = list(run_commands_in_sandbox(["echo first", "sleep 30", "echo never"], timeout=1))
 
-if __name__ == "__main__":
-    sys.exit(run_all_tests())
+    assert time.monotonic() - start < 15, "Hung command was not stopped by its own timeout"
+    assert [r["returncode"] for r in results] == [0, 124], results
+    assert results[1]["stderr"].endswith("Command timeout after 1 seconds")
@@ -0,0 +1,111 @@
+"""
+Dataset analysis tests (workspace/analyze_datasets.py)
+"""
+import importlib, os, random
+from collections import defaultdict
+from pathlib import Path
+
+import pytest
+
+
+@pytest.fixture(scope="module")
+def ad(tmp_path_factory):
+    """The analyze_datasets module, imported from a temp cwd (it creates its staging dir on import)"""
+    cwd = os.getcwd()
+    os.chdir(tmp_path_factory.mktemp("analyze_datasets"))
+    try:
+        return importlib.import_module("workspace.analyze_datasets")
+    finally:
+        os.chdir(cwd)
+
+
+ENVIRONMENTS = ("indoor", "outdoor", "unknown")
+SHOT_TYPES = ("closeup", "medium", "wide", "other")
+LIGHTINGS = ("bright", "dim", "neutral")
+
+
+def _records(seed: int, n: int) -> list:
+    """Real/fake records over skewed categories, so some categories run out before others"""
+    rng = random.Random(seed)
+    weights = [rng.choice((1, 1, 3, 10, 40)) for _ in range(len(ENVIRONMENTS) * len(SHOT_TYPES) * len(LIGHTINGS))]
+    combos = [(e, s, l) for e in ENVIRONMENTS for s in SHOT_TYPES for l in LIGHTINGS]
+    records = []
+    for i in range(n):
+        environment, shot_type, lighting = rng.choices(combos, weights)[0]
+        records.append({
+            "path": f"/data/set{rng.randrange(5)}/clip_{rng.randrange(10 ** 6):06d}_{i}.mp4",
+            "label": rng.choice(("real", "real", "real", "fake")),
+            "suitable": rng.random() < 0.8,
+            "environment": environment,
+            "shot_type": shot_type,
+            "lighting": lighting,
+        })
+    return records
+
+
+def _reference_sampling(records) -> tuple:
+    """The original algorithm: one-unit round-robin remainder, then sorted()[:quota] per category"""
+    real_recs = [r for r in records if r["label"] == "real"]
+    suitable_reals = [r for r in real_recs if r["suitable"]]
+    pool = suitable_reals if suitable_reals else real_recs
+    target = min(len(pool), max(200, -(-len(pool) // 4)), 1000)
+    comp_to_indices = defaultdict(list)
+    for idx, r in enumerate(pool):
+        comp_to_indices[f"{r['environment']}:{r['shot_type']}:{r['lighting']}"].append(idx)
+    categories = list(comp_to_indices)
+    base_quota = max(1, target // len(categories))
+    quotas = {c: min(len(comp_to_indices[c]), base_quota) for c in categories}
+    remainder = target - sum(quotas.values())
+    avail_sorted = sorted(categories, key=lambda c: len(comp_to_indices[c]))
+    i = 0
+    while remainder > 0 and any(quotas[c] < len(comp_to_indices[c]) for c in categories):
+        c = avail_sorted[i % len(avail_sorted)]
+        if quotas[c] < len(comp_to_indices[c]):
+            quotas[c] += 1
+            remainder -= 1
+        i += 1
+    selected = []
+    for c in categories:
+        selected.extend(sorted(comp_to_indices[c], key=lambda ix: pool[ix]["path"])[:quotas[c]])
+    return quotas, [pool[ix]["path"] for ix in selected]
+
+
+@pytest.mark.parametrize("seed,n", [(7, 900), (18, 2500), (2024, 5200), (3, 150)])
+def test_sampling_matches_reference(ad, seed, n):
+    """Test: Whole-round quotas and nsmallest selection pick exactly what the original loop did"""
+    records = _records(seed, n)
+    quotas, paths = _reference_sampling(records)
+
+    sampling = ad.compute_sampling(records, summary=None)
+
+    assert sampling["category_quota"] == quotas, "Category quotas differ from the round-robin reference"
+    assert [r["path"] for r in sampling["selected"]] == paths, "Selected sample differs from the reference"
+    assert sampling["target_total_real"] == len(paths)
+
+
+def test_scan_datasets_bounded_and_ordered(ad, tmp_path, monkeypatch):
+    """Test: Records come back in os.walk order with a bounded number of videos in flight"""
+    for d in range(6):
+        for sub in ("", "clips", "clips/raw"):
+            folder = tmp_path / f"set_{d}" / sub
+            folder.mkdir(parents=True, exist_ok=True)
+            for i in range(12):
+                (folder / f"video_{i}_1080p.mp4").write_bytes(b"")
+            for name in ("notes.txt", ".mp4", "..mp4", "...mp4", "clip.MOV", "clip.mp4."):
+                (folder / name).write_bytes(b"")
+    expected = [os.path.join(root, name) for root, _, files in os.walk(tmp_path)
+                for name in files if Path(name).suffix.lower() in ad.VIDEO_EXTS]
+    monkeypatch.setattr(ad, "DATASET_DIRS_RAW", [str(tmp_path)])
+    started = []
+    real_analyze = ad.analyze_video
+    monkeypatch.setattr(ad, "analyze_video", lambda vp, roots: started.append(vp) or real_analyze(vp, roots))
+
+    stat_threads = 2
+    window = stat_threads * ad.ANALYZE_WINDOW_PER_THREAD
+    paths, max_in_flight = [], 0
+    for rec in ad.scan_datasets(stat_threads=stat_threads):
+        paths.append(rec["path"])
+        max_in_flight = max(max_in_flight, len(started) - len(paths))
+
+    assert paths == expected, "Records not in os.walk order"
+    assert max_in_flight <= window, f"{max_in_flight} videos in flight, window is {window}"
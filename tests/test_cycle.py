@@ -0,0 +1,55 @@
+"""
+Orchestrator cycle tests (src/orchestrator/cycle.py)
+
+Actions run from a temp cwd so the ledger (reports/ledger.jsonl) stays out of the repo.
+"""
+import sys
+
+import pytest
+
+from src.orchestrator import cycle
+
+
+@pytest.fixture
+def run_dir(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+def _container_cmd(script: str) -> dict:
+    return {"id": "A1", "type": "exec.container_cmd", "params": {"cmd": f'"{sys.executable}" -c "{script}"'}}
+
+
+def test_container_cmd_keeps_head_and_tail(run_dir):
+    """Test: Large stdout keeps its first and last lines and reports the full size"""
+    script = ("import sys; w = sys.stdout.write; w('Wrote: first.json\\n'); "
+              "[w('x' * 99 + '\\n') for _ in range(2000)]; w('done')")
+
+    result = cycle.execute_action(_container_cmd(script), policy=None, plan_id="test")
+
+    assert result["ok"], f"Command failed: {result}"
+    total = len("Wrote: first.json\n") + 2000 * 100 + len("done")
+    assert result["stdout_truncated"] and result["stdout_bytes"] == total, f"Wrong size fields: {result['stdout_bytes']}"
+    assert "Wrote: first.json" in result["stdout"][:1000], "Early output lost from stdout"
+    assert result["stdout"].endswith("done"), "Final output lost from stdout"
+    assert len(result["stdout"]) < total, "stdout not clipped"
+    assert result["stdout_lines"] == 2002, f"Expected 2002 lines, got {result['stdout_lines']}"
+
+
+def test_container_cmd_small_output(run_dir):
+    """Test: Small stdout is returned whole; a last line without a newline is counted"""
+    result = cycle.execute_action(_container_cmd("print('a'); print('b', end='')"), policy=None, plan_id="test")
+
+    assert result["stdout"] == "a\nb", f"Unexpected stdout: {result['stdout']!r}"
+    assert not result["stdout_truncated"] and result["stdout_lines"] == 2, f"Wrong fields: {result}"
+
+
+def test_ledger_line_format(run_dir, monkeypatch):
+    """Test: Ledger lines keep the json.dumps format of existing ledgers (", "/": " separators, ASCII-escaped)"""
+    monkeypatch.setattr(cycle.time, "strftime", lambda fmt, t=None: "2025-10-28T18:30:00Z")
+    cycle.log("action_result", action_id="A1", ok=True, cmd_preview="echo héllo", stdout_lines=2)
+
+    assert cycle.LEDGER.read_bytes() == (
+        b'{"ts": "2025-10-28T18:30:00Z", "kind": "action_result", "action_id": "A1", "ok": true, '
+        b'"cmd_preview": "echo h\\u00e9llo", "stdout_lines": 2}\n'
+    ), "Ledger line differs from the json.dumps format"
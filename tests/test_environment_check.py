@@ -0,0 +1,53 @@
+"""
+GPU detection tests (check_gpu in src/utils/environment_check.py)
+
+Device nodes and nvidia-smi are replaced with fakes, so these run on any host.
+"""
+import subprocess
+
+import pytest
+
+from src.utils import environment_check
+
+
+@pytest.fixture(autouse=True)
+def fresh_checks():
+    """Each test starts and ends with no memoized check results"""
+    environment_check.clear_check_caches()
+    yield
+    environment_check.clear_check_caches()
+
+
+@pytest.fixture
+def fake_gpu_host(monkeypatch):
+    """Host with the given device nodes whose nvidia-smi exits with smi_returncode; returns argv calls"""
+    calls = []
+
+    def install(nodes, smi_returncode):
+        monkeypatch.setattr(environment_check.os.path, "exists", lambda path: path in nodes)
+        monkeypatch.setattr(environment_check.glob, "glob", lambda pattern: [])
+
+        def run(cmd, timeout=5, want_stdout=True):
+            calls.append(cmd)
+            ok = cmd[0] == "nvidia-smi" and smi_returncode == 0
+            return subprocess.CompletedProcess(cmd, 0 if ok else 1, "Tesla T4, 535.0, 15360 MiB\n" if ok else "")
+        monkeypatch.setattr(environment_check, "_run", run)
+        return calls
+    return install
+
+
+@pytest.mark.parametrize("include_devices", [True, False], ids=["devices", "presence-only"])
+@pytest.mark.parametrize("nodes,smi_returncode,nvidia", [
+    ((), 0, False),
+    (("/dev/dxg",), 1, False),
+    (("/dev/nvidiactl",), 1, False),
+    (("/dev/dxg",), 0, True),
+    (("/dev/nvidiactl",), 0, True),
+], ids=["no-node", "wsl-non-nvidia", "broken-driver", "wsl-nvidia", "nvidia"])
+def test_nvidia_confirmed_by_nvidia_smi(fake_gpu_host, nodes, smi_returncode, nvidia, include_devices):
+    """Test: A device node alone never reports NVIDIA; nvidia-smi has to answer"""
+    calls = fake_gpu_host(set(nodes), smi_returncode)
+
+    assert environment_check.check_gpu(include_devices=include_devices)["nvidia"] is nvidia
+    if not nodes:
+        assert calls == [], "Forked nvidia-smi on a host without an NVIDIA device node"
@@ -0,0 +1,142 @@
+"""
+Dataset promotion gateway tests (src/gateway/gateway.py)
+
+Each test promotes from a temp project root (configs/policy.yaml, staging/,
+dataset/), so nothing is written to the real dataset or manifest.
+"""
+import hashlib, json
+from pathlib import Path
+
+import pytest
+
+from src.gateway import gateway
+from src.gateway.policy import Policy
+
+
+def _policy(root: Path, hash_algo: str) -> Policy:
+    (root / "configs").mkdir(exist_ok=True)
+    (root / "configs" / "policy.yaml").write_text(
+        "constraints:\n"
+        "  write_roots:\n"
+        "    - \"staging\"\n"
+        f"  manifest_hash_algo: {hash_algo}\n",
+        encoding="utf-8",
+    )
+    return Policy()
+
+
+@pytest.fixture
+def project(tmp_path, monkeypatch):
+    """Temp project root as cwd, with one staged file"""
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "staging").mkdir()
+    (tmp_path / "staging" / "clip.json").write_bytes(b'{"frames": 24}\n')
+    return tmp_path
+
+
+def _manifest_records(root: Path) -> list:
+    lines = (root / gateway.MANIFEST).read_text(encoding="utf-8").splitlines()
+    return [json.loads(line) for line in lines]
+
+
+def test_promote_sha256_digest_fields(project):
+    """Test: sha256 promotions record hash/hash_algo and keep the legacy sha256 field"""
+    expected = hashlib.sha256(b'{"frames": 24}\n').hexdigest()
+
+    [result] = gateway.ingest_promote([{"src": "staging/clip.json"}], _policy(project, "sha256"))
+
+    assert result["ok"], f"Promotion failed: {result}"
+    [rec] = _manifest_records(project)
+    for fields in (result, rec):
+        assert fields["hash"] == expected and fields["hash_algo"] == "sha256", f"Wrong digest fields: {fields}"
+        assert fields["sha256"] == expected, "Legacy sha256 field missing for a sha256 digest"
+
+
+def test_promote_blake3_digest_fields(project):
+    """Test: blake3 promotions record hash/hash_algo without a sha256 field"""
+    blake3 = pytest.importorskip("blake3")
+    expected = blake3.blake3(b'{"frames": 24}\n').hexdigest()
+
+    [result] = gateway.ingest_promote([{"src": "staging/clip.json"}], _policy(project, "blake3"))
+
+    assert result["ok"], f"Promotion failed: {result}"
+    [rec] = _manifest_records(project)
+    for fields in (result, rec):
+        assert fields["hash"] == expected and fields["hash_algo"] == "blake3", f"Wrong digest fields: {fields}"
+        assert "sha256" not in fields, "blake3 digest recorded under the sha256 field"
+
+
+def test_promote_blake3_falls_back_to_sha256(project, monkeypatch):
+    """Test: blake3 policy without the blake3 package records a sha256 digest"""
+    monkeypatch.setattr(gateway, "blake3", None)
+    expected = hashlib.sha256(b'{"frames": 24}\n').hexdigest()
+
+    [result] = gateway.ingest_promote([{"src": "staging/clip.json"}], _policy(project, "blake3"))
+
+    assert result["ok"], f"Promotion failed: {result}"
+    assert result["hash_algo"] == "sha256" and result["hash"] == result["sha256"] == expected, \
+        f"Fallback digest fields wrong: {result}"
+
+
+def test_copy_and_hash_refuses_existing_dst(tmp_path):
+    """Test: copy_and_hash never overwrites an existing destination"""
+    src, dst = tmp_path / "src.bin", tmp_path / "dst.bin"
+    src.write_bytes(b"new content")
+    dst.write_bytes(b"original")
+
+    with pytest.raises(FileExistsError):
+        gateway.copy_and_hash(src, dst)
+
+    assert dst.read_bytes() == b"original", "Existing destination was modified"
+
+
+def test_promote_onto_existing_dst_fails(project, monkeypatch):
+    """Test: A destination created after the exists() check is reported, not overwritten"""
+    policy = _policy(project, "sha256")
+    real_copy = gateway.copy_and_hash
+
+    def racing_copy(src, dst, algo="sha256"):
+        dst.write_bytes(b"original")  # another writer wins the race
+        return real_copy(src, dst, algo)
+
+    monkeypatch.setattr(gateway, "copy_and_hash", racing_copy)
+    [result] = gateway.ingest_promote([{"src": "staging/clip.json"}], policy)
+
+    assert not result["ok"] and result["error"] == "dst exists", f"Unexpected result: {result}"
+    [dst] = (project / "dataset").rglob("clip.json")
+    assert dst.read_bytes() == b"original", "Existing destination was modified"
+    assert not (project / gateway.MANIFEST).exists(), "Manifest entry written for a failed promotion"
+
+
+def test_copy_and_hash_failure_leaves_no_partial_file(tmp_path, monkeypatch):
+    """Test: A copy that fails mid-way removes the partial destination"""
+    src, dst = tmp_path / "src.bin", tmp_path / "dst.bin"
+    src.write_bytes(b"x" * (3 << 22))  # several read buffers
+
+    class FailingHasher:
+        def __init__(self):
+            self.calls = 0
+
+        def update(self, buf):
+            self.calls += 1
+            if self.calls == 2:
+                raise OSError("disk went away")
+
+    monkeypatch.setattr(gateway, "new_hasher", lambda algo: FailingHasher())
+
+    with pytest.raises(OSError, match="disk went away"):
+        gateway.copy_and_hash(src, dst)
+
+    assert not dst.exists(), "Partial destination left behind"
+
+
+def test_jsonl_bytes_fallback_matches_orjson(monkeypatch):
+    """Test: Manifest lines are byte-identical with and without orjson"""
+    pytest.importorskip("orjson")
+    recs = [{"dst": "dataset/2025/10/28/clip.json", "hash": "ab12", "bytes": 15, "tags": {"lang": "日本語"}},
+            {"dst": "dataset/2025/10/28/b.wav", "hash": "cd34", "bytes": 0, "tags": {}}]
+    with_orjson = gateway.jsonl_bytes(recs)
+
+    monkeypatch.setattr(gateway, "orjson", None)
+
+    assert gateway.jsonl_bytes(recs) == with_orjson, "json fallback writes a different line format"
@@ -0,0 +1,124 @@
+"""
+Platform path tests (src/platform/path_adapter.py, src/platform/docker_probe.py)
+
+wslpath and docker are replaced with fakes, so these run on any host.
+"""
+import sys
+
+import pytest
+
+from src.platform import docker_probe, path_adapter
+
+
+@pytest.fixture(autouse=True)
+def fresh_detection():
+    """Each test starts and ends with no cached platform answers"""
+    path_adapter._reset()
+    docker_probe._reset()
+    yield
+    path_adapter._reset()
+    docker_probe._reset()
+
+
+@pytest.fixture
+def fake_wslpath(monkeypatch):
+    """wslpath that mounts drives under root; returns the list of argv it was called with"""
+    calls = []
+
+    def install(root=None):
+        def check_output(argv, **kwargs):
+            calls.append(argv)
+            if root is None or argv[0] != "wslpath":
+                raise FileNotFoundError(argv[0])
+            path = argv[-1]
+            return f"{root}{path[0].lower()}/{path[3:].replace(chr(92), '/')}\n"
+        monkeypatch.setattr(path_adapter.subprocess, "check_output", check_output)
+        return calls
+    return install
+
+
+@pytest.mark.parametrize("win_path,expected", [
+    ("C:\\Users\\me\\data.csv", "/mnt/c/Users/me/data.csv"),
+    ("d:\\", "/mnt/d/"),
+    ("E:/mixed\\sep/file", "/mnt/e/mixed/sep/file"),
+    ("F:\\a\\\\b", "/mnt/f/a//b"),
+], ids=["drive-letter", "drive-root", "mixed-separators", "double-backslash"])
+def test_to_wsl_path_fallback(fake_wslpath, win_path, expected):
+    """Test: Without wslpath, drive letters map under /mnt and backslashes become slashes"""
+    fake_wslpath(root=None)
+
+    assert path_adapter.to_wsl_path(win_path) == expected
+
+
+def test_to_wsl_paths_matches_to_wsl_path(fake_wslpath):
+    """Test: The batch form gives the same answers as one to_wsl_path call per path"""
+    fake_wslpath(root=None)
+    paths = ["C:\\Users\\me\\data.csv", "d:\\", "E:/mixed\\sep/file"]
+
+    assert path_adapter.to_wsl_paths(paths) == [path_adapter.to_wsl_path(p) for p in paths]
+
+
+def test_to_wsl_paths_custom_automount_root(fake_wslpath):
+    """Test: Drive paths follow a non-default automount root, probed with one wslpath call"""
+    calls = fake_wslpath(root="/win/")
+
+    first = path_adapter.to_wsl_paths(["C:\\src\\app.py", "D:\\data\\clip.mp4"])
+    second = path_adapter.to_wsl_paths(["Z:\\x"])
+
+    assert first == ["/win/c/src/app.py", "/win/d/data/clip.mp4"]
+    assert second == ["/win/z/x"]
+    assert calls == [["wslpath", "-a", "C:\\"]], f"Expected one automount probe, got {calls}"
+
+
+def test_to_wsl_paths_sends_unc_paths_to_wslpath(fake_wslpath):
+    """Test: Paths without a drive letter still go through wslpath one by one"""
+    calls = fake_wslpath(root="/mnt/")
+
+    path_adapter.to_wsl_paths(["\\\\server\\share\\f.txt"])
+
+    assert ["wslpath", "-a", "\\\\server\\share\\f.txt"] in calls
+
+
+def test_path_adapter_reset_clears_automount_root(fake_wslpath):
+    """Test: _reset() forgets the probed automount root"""
+    fake_wslpath(root="/win/")
+    assert path_adapter.to_wsl_paths(["C:\\x"]) == ["/win/c/x"]
+
+    fake_wslpath(root=None)
+    assert path_adapter.to_wsl_paths(["C:\\x"]) == ["/win/c/x"], "Automount root should be cached"
+    path_adapter._reset()
+
+    assert path_adapter.to_wsl_paths(["C:\\x"]) == ["/mnt/c/x"]
+
+
+def test_path_adapter_reset_rebinds_mount_path(monkeypatch):
+    """Test: _reset() re-detects the host OS and rebinds docker_mount_host_path"""
+    if path_adapter.is_wsl():
+        pytest.skip("WSL hosts always use posix mount paths")
+    monkeypatch.setattr(sys, "platform", "win32")
+    assert path_adapter._mount_path is path_adapter._posix_mount_path, "Host OS detection should be cached"
+
+    path_adapter._reset()
+
+    assert path_adapter._mount_path is path_adapter._windows_mount_path
+
+
+def test_docker_probe_reset_clears_mount_style(monkeypatch):
+    """Test: The mount style is probed once and re-probed after _reset()"""
+    probes = []
+
+    def check_output(argv, **kwargs):
+        probes.append(argv)
+        return "Docker Desktop (Windows)\n"
+
+    monkeypatch.delenv("PREFERRED_MOUNT_STYLE", raising=False)
+    monkeypatch.setattr(docker_probe.subprocess, "check_output", check_output)
+
+    assert docker_probe.probe_mount_style() == "windows"
+    monkeypatch.setenv("PREFERRED_MOUNT_STYLE", "wslposix")
+    assert docker_probe.probe_mount_style() == "windows", "Mount style should be cached"
+    assert len(probes) == 1, "docker info should run once"
+
+    docker_probe._reset()
+
+    assert docker_probe.probe_mount_style() == "wslposix"
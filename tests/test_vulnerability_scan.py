@@ -0,0 +1,114 @@
+"""
+Vulnerability scanning tests (SecurityScanAdapter.scan_for_vulnerabilities in src/utils/test_adapters.py)
+
+grype and pip-audit are replaced by small shell scripts on a temp PATH, so each
+test controls exactly what the scanner prints and how it exits.
+"""
+import json, sys
+
+import pytest
+
+from src.utils import test_adapters
+from src.utils.test_adapters import SecurityScanAdapter
+
+GRYPE_REPORT = {"matches": [
+    {"vulnerability": {"id": "CVE-2024-0001", "severity": "High"}, "artifact": {"name": "requests", "version": "2.0.0"}},
+    {"vulnerability": {"id": "CVE-2024-0002", "severity": "Low"}, "artifact": {"name": "idna", "version": "2.5"}},
+]}
+
+pytestmark = pytest.mark.skipif(sys.platform == "win32", reason="fake tools are POSIX shell scripts")
+
+
+@pytest.fixture(params=["ijson", "json"])
+def tool_bin(request, tmp_path, monkeypatch):
+    """Empty temp PATH; returns add(name, stdout, exit_status) to install a fake tool"""
+    if request.param == "ijson":
+        pytest.importorskip("ijson")
+    else:
+        monkeypatch.setattr(test_adapters, "ijson", None)
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    monkeypatch.setenv("PATH", str(bin_dir))
+
+    def add(name: str, stdout: str, exit_status: int = 0):
+        (bin_dir / f"{name}.out").write_text(stdout, encoding="utf-8")
+        script = bin_dir / name
+        script.write_text(f'#!/bin/sh\n/bin/cat "{bin_dir / name}.out"\nexit {exit_status}\n', encoding="utf-8")
+        script.chmod(0o755)
+    return add
+
+
+def test_no_scanner_installed(tmp_path, tool_bin):
+    """Test: Without grype or pip-audit the result says no scanner is available"""
+    results = SecurityScanAdapter.scan_for_vulnerabilities(tmp_path)
+
+    assert results["method"] is None and results["passed"]
+    assert results["message"] == "No vulnerability scanner available (install grype)"
+
+
+def test_grype_report(tmp_path, tool_bin):
+    """Test: grype matches are reduced to id/severity/package/version and High fails the scan"""
+    tool_bin("grype", json.dumps(GRYPE_REPORT))
+
+    results = SecurityScanAdapter.scan_for_vulnerabilities(tmp_path)
+
+    assert results["method"] == "grype" and not results["passed"], f"Unexpected result: {results}"
+    assert [v["id"] for v in results["vulnerabilities"]] == ["CVE-2024-0001", "CVE-2024-0002"]
+    assert results["severity_breakdown"] == {"High": 1, "Low": 1}
+
+
+@pytest.mark.parametrize("stdout,exit_status,error", [
+    ("", 0, "grype failed: grype: "),
+    ('{"matches": [', 0, "grype failed: grype: malformed JSON output"),
+    ("", 1, "grype exited with an error"),
+], ids=["empty", "truncated", "exit-status"])
+def test_grype_failure_is_reported(tmp_path, tool_bin, stdout, exit_status, error):
+    """Test: A failing grype is reported as a failure, not as a missing scanner"""
+    tool_bin("grype", stdout, exit_status)
+
+    results = SecurityScanAdapter.scan_for_vulnerabilities(tmp_path)
+
+    assert results["method"] is None
+    assert results["errors"][0].startswith(error), f"Unexpected errors: {results['errors']}"
+    assert results["message"].startswith("Vulnerability scan failed: "), results["message"]
+    assert "not available" not in results["message"]
+
+
+def test_pip_audit_fallback_after_grype_failure(tmp_path, tool_bin):
+    """Test: A failing grype still falls back to pip-audit, whose exit status 1 means findings"""
+    tool_bin("grype", "")
+    tool_bin("pip-audit", json.dumps({"dependencies": [{"name": "requests", "vulns": [{"id": "PYSEC-1"}]}]}), 1)
+
+    results = SecurityScanAdapter.scan_for_vulnerabilities(tmp_path)
+
+    assert results["method"] == "pip-audit" and not results["passed"], f"Unexpected result: {results}"
+    assert results["vulnerabilities"][0]["name"] == "requests"
+
+
+def test_pip_audit_failure_is_reported(tmp_path, tool_bin):
+    """Test: pip-audit with no output is reported with its exit status"""
+    tool_bin("pip-audit", "", 2)
+
+    results = SecurityScanAdapter.scan_for_vulnerabilities(tmp_path)
+
+    assert results["errors"] == ["pip-audit exited with status 2 and no output"], results
+
+
+@pytest.mark.parametrize("files,found", [
+    ({"src/app.py": b"print('hi')\n"}, False),
+    ({"run.sh": b"#!/bin/sh\necho hi\n"}, False),
+    ({"nested/svc/requirements.txt": b"requests==2.0.0\n"}, True),
+    ({"venv/lib/site-packages/requests-2.0.0.dist-info/METADATA": b"Name: requests\n"}, True),
+    ({"web/node_modules/left-pad/package.json": b"{}\n"}, True),
+    ({"lib/app.jar": b"PK\x03\x04"}, True),
+    ({"bin/server": b"\x7fELF\x02\x01\x01"}, True),
+], ids=["source-only", "shell-script", "nested-manifest", "vendored-venv", "node-modules", "jar", "go-binary"])
+def test_dependency_inputs_detected(tmp_path, files, found):
+    """Test: SBOM/CVE scans are skipped only when nothing syft/grype could inventory exists"""
+    for rel, data in files.items():
+        path = tmp_path / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(data)
+        path.chmod(0o755)
+
+    assert test_adapters._has_dependency_manifest(tmp_path) is found
@@ -4,11 +4,23 @@ import re
 import json
 import sys
 import math
+import argparse
+import bisect
 import datetime
-from collections import defaultdict, Counter
+import functools
+import heapq
+from collections import defaultdict, deque, Counter
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
+try:
+    import orjson  # optional: C JSON encoder for the report/manifest outputs
+except ImportError:
+    orjson = None
+
 VIDEO_EXTS = {'.mp4', '.mov', '.avi', '.mkv', '.webm', '.mpg', '.mpeg', '.m4v'}
+STAT_THREADS = 32  # concurrent directory scans / sidecar lookups (--stat-threads)
+ANALYZE_WINDOW_PER_THREAD = 4  # videos in flight per thread; bounds memory on huge trees
 
 DATASET_DIRS_RAW = [
     r"X:\\dataset_3",
@@ -25,23 +37,31 @@ DIVERSITY_BALANCE_JSON = STAGING_DIR / "diversity_balance.json"
 VERDICT_MD = STAGING_DIR / "verdict.md"
 
 KEYWORDS = {
-    'indoor': {"indoor", "office", "room", "studio", "kitchen", "livingroom", "conference"},
-    'outdoor': {"outdoor", "street", "park", "beach", "field", "plaza", "square", "forest", "road"},
-    'selfie': {"selfie", "frontcam", "front_cam", "handheld", "vlog"},
-    'interview': {"interview", "podcast", "talkshow", "talk_show", "sitdown"},
-    'talking_head': {"talkinghead", "talking_head", "news", "anchor"},
-    'low': {"lowlight", "low_light", "dark", "night"},
-    'bright': {"sunny", "bright", "overexposed"},
-    'neutral': {"neutral", "normal", "daylight"},
-    'hq': {"4k", "uhd", "2160p", "1440p", "1080p", "fullhd"},
-    'mq': {"720p", "hd"},
-    'lq': {"480p", "360p", "240p", "sd"},
-    'fake': {"deepfake", "fake", "swap", "faceswap", "dfdc"},
-    'real': {"real", "authentic", "genuine"},
+    'indoor': frozenset({"indoor", "office", "room", "studio", "kitchen", "livingroom", "conference"}),
+    'outdoor': frozenset({"outdoor", "street", "park", "beach", "field", "plaza", "square", "forest", "road"}),
+    'selfie': frozenset({"selfie", "frontcam", "front_cam", "handheld", "vlog"}),
+    'interview': frozenset({"interview", "podcast", "talkshow", "talk_show", "sitdown"}),
+    'talking_head': frozenset({"talkinghead", "talking_head", "news", "anchor"}),
+    'low': frozenset({"lowlight", "low_light", "dark", "night"}),
+    'bright': frozenset({"sunny", "bright", "overexposed"}),
+    'neutral': frozenset({"neutral", "normal", "daylight"}),
+    'hq': frozenset({"4k", "uhd", "2160p", "1440p", "1080p", "fullhd"}),
+    'mq': frozenset({"720p", "hd"}),
+    'lq': frozenset({"480p", "360p", "240p", "sd"}),
+    'fake': frozenset({"deepfake", "fake", "swap", "faceswap", "dfdc"}),
+    'real': frozenset({"real", "authentic", "genuine"}),
+}
+
+# Flat keyword -> KEYWORDS groups map: one dict lookup per token instead of a set
+# intersection per group (see keyword_hits)
+KEYWORD_TO_GROUPS = {
+    kw: tuple(group for group, kws in KEYWORDS.items() if kw in kws)
+    for kw in frozenset().union(*KEYWORDS.values())
 }
 
 RESO_RE = re.compile(r"(?P<w>\d{3,5})[xX](?P<h>\d{3,5})")
 P_RE = re.compile(r"(?P<p>\d{3,4})p\b")
+TOKEN_RE = re.compile(r"[A-Za-z0-9]+")
 
 
 def resolve_dataset_path(p: str) -> Path:
@@ -69,46 +89,91 @@ def resolve_dataset_path(p: str) -> Path:
     return as_is  # may not exist; handled later
 
 
-def find_sidecar_json(video_path: Path):
-    candidates = []
-    base = video_path.with_suffix('')
-    cand1 = base.with_suffix('.json')
-    if cand1.exists():
-        candidates.append(cand1)
+@functools.lru_cache(maxsize=4096)
+def _json_listing(folder: str):
+    """One scandir per directory: (names of *.json entries, {stem.lower(): names in listing order})"""
+    names, by_stem = set(), defaultdict(list)
+    try:
+        with os.scandir(folder) as it:
+            for entry in it:
+                if entry.name.endswith('.json'):  # same matches as Path.glob('*.json')
+                    names.add(entry.name)
+                    by_stem[Path(entry.name).stem.lower()].append(entry.name)
+    except OSError:
+        pass
+    return frozenset(names), {k: tuple(v) for k, v in by_stem.items()}
+
+
+def _sidecar_candidates(base: Path, cand1: Path, folder: Path):
+    """Sidecar paths in lookup order, produced lazily so a matching <stem>.json skips the rest"""
+    json_names, json_by_stem = _json_listing(str(folder))
+    if cand1.name in json_names:
+        yield cand1
     # Any metadata.json in same folder
-    folder = video_path.parent
     meta1 = folder / 'metadata.json'
-    if meta1.exists():
-        candidates.append(meta1)
+    if meta1.name in json_names:
+        yield meta1
     # Any json with same stem ignoring case
-    for j in folder.glob('*.json'):
+    for name in json_by_stem.get(base.name.lower(), ()):
+        j = folder / name
         if j == cand1 or j == meta1:
             continue
-        if j.stem.lower() == base.name.lower():
-            candidates.append(j)
+        yield j
+
+
+def find_sidecar_json(video_path: Path):
+    base = video_path.with_suffix('')
+    cand1 = base.with_suffix('.json')
     # Return first loadable json dict that refers to this file or generic
-    for j in candidates:
-        try:
-            with open(j, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            # If it's a list, try to find entry referring to file
-            if isinstance(data, list):
-                for item in data:
-                    if isinstance(item, dict):
-                        fp = str(item.get('file') or item.get('path') or '').lower()
-                        if video_path.name.lower() in fp:
-                            return item
-                return None
-            elif isinstance(data, dict):
-                # If dict with 'file' referencing, ensure match or accept as generic sidecar
-                fp = str(data.get('file') or data.get('path') or '')
-                if not fp or video_path.name.lower() in fp.lower() or j == cand1:
-                    return data
-        except Exception:
-            continue
+    name = video_path.name.lower()
+    for j in _sidecar_candidates(base, cand1, video_path.parent):
+        data, refs, starts = _load_sidecar(str(j))
+        # If it's a list, try to find entry referring to file
+        if isinstance(data, list):
+            pos = refs.find(name)
+            return data[bisect.bisect_right(starts, pos) - 1] if pos >= 0 else None
+        elif isinstance(data, dict):
+            # If dict with 'file' referencing, ensure match or accept as generic sidecar
+            if not refs or name in refs or j == cand1:
+                return data
     return None
 
 
+@functools.lru_cache(maxsize=1024)
+def _load_sidecar(path: str):
+    """
+    Parse a sidecar once per run (a shared metadata.json serves every video in its folder).
+
+    Returns (data, refs, starts): refs is the lowercased 'file'/'path' reference of a
+    dict, or for a list the references of its dict entries joined by NUL, starting
+    at the offsets in starts, so the first entry containing a file name is one
+    str.find plus a bisect. data is None if the file cannot be read or parsed.
+    """
+    try:
+        raw = Path(path).read_bytes()
+        data = None
+        if orjson is not None:
+            try:
+                data = orjson.loads(raw)
+            except orjson.JSONDecodeError:  # e.g. NaN literals, which json accepts
+                pass
+        if data is None:
+            data = json.loads(raw.decode('utf-8'))
+    except Exception:
+        return None, None, None
+    if isinstance(data, list):
+        refs, starts, pos = [], [], 0
+        for item in data:
+            ref = str(item.get('file') or item.get('path') or '').lower() if isinstance(item, dict) else ''
+            refs.append(ref)
+            starts.append(pos)
+            pos += len(ref) + 1
+        return data, '\0'.join(refs), starts
+    if isinstance(data, dict):
+        return data, str(data.get('file') or data.get('path') or '').lower(), None
+    return data, None, None
+
+
 def parse_resolution(meta, path_tokens):
     w = h = None
     if isinstance(meta, dict):
@@ -165,19 +230,26 @@ def parse_duration(meta):
     return None
 
 
-def token_set(path: Path, meta):
-    tokens = []
-    for part in path.parts:
-        if part:
-            tokens.extend(re.split(r"[^A-Za-z0-9]+", part.lower()))
+def token_set(path: Path, meta, parts=None):
+    # Path parts and string metadata values joined on a non-token separator: one lower() + findall per file
+    texts = list(path.parts if parts is None else parts)
     if isinstance(meta, dict):
-        for k, v in meta.items():
-            if isinstance(v, str):
-                tokens.extend(re.split(r"[^A-Za-z0-9]+", v.lower()))
-    return set([t for t in tokens if t])
+        texts.extend(v for v in meta.values() if isinstance(v, str))
+    return set(TOKEN_RE.findall('/'.join(texts).lower()))
 
 
-def infer_label(meta, toks):
+def keyword_hits(toks):
+    """Names of the KEYWORDS groups that any token belongs to"""
+    return frozenset(g for t in toks for g in KEYWORD_TO_GROUPS.get(t, ()))
+
+
+@functools.lru_cache(maxsize=4096)
+def _dir_keyword_hits(folder: Path):
+    """keyword_hits of a directory's path parts, shared by every video in it"""
+    return keyword_hits(token_set(folder, None))
+
+
+def infer_label(meta, hits):
     # From metadata
     if isinstance(meta, dict):
         for key in ['label', 'type', 'class', 'target']:
@@ -193,14 +265,14 @@ def infer_label(meta, toks):
             if isinstance(v, bool):
                 return 'fake' if v else 'real'
     # From tokens
-    if (KEYWORDS['fake'] & toks) and not (KEYWORDS['real'] & toks):
+    if 'fake' in hits and 'real' not in hits:
         return 'fake'
-    if (KEYWORDS['real'] & toks) and not (KEYWORDS['fake'] & toks):
+    if 'real' in hits and 'fake' not in hits:
         return 'real'
     return 'unknown'
 
 
-def infer_environment(meta, toks):
+def infer_environment(meta, hits):
     if isinstance(meta, dict):
         for key in ['environment', 'env', 'location']:
             v = meta.get(key)
@@ -210,14 +282,14 @@ def infer_environment(meta, toks):
                     return 'indoor'
                 if 'outdoor' in lv:
                     return 'outdoor'
-    if KEYWORDS['indoor'] & toks:
+    if 'indoor' in hits:
         return 'indoor'
-    if KEYWORDS['outdoor'] & toks:
+    if 'outdoor' in hits:
         return 'outdoor'
     return 'unknown'
 
 
-def infer_shot_type(meta, toks):
+def infer_shot_type(meta, hits):
     if isinstance(meta, dict):
         for key in ['shot_type', 'shot', 'camera', 'category']:
             v = meta.get(key)
@@ -232,13 +304,13 @@ def infer_shot_type(meta, toks):
                     return 'interview'
                 if 'talking' in lv or 'anchor' in lv or 'news' in lv:
                     return 'talking_head'
-    for st, kws in [('selfie', KEYWORDS['selfie']), ('interview', KEYWORDS['interview']), ('talking_head', KEYWORDS['talking_head'])]:
-        if kws & toks:
+    for st in ('selfie', 'interview', 'talking_head'):
+        if st in hits:
             return st
     return 'other'
 
 
-def infer_lighting(meta, toks):
+def infer_lighting(meta, hits):
     if isinstance(meta, dict):
         for key in ['lighting', 'light']:
             v = meta.get(key)
@@ -250,16 +322,16 @@ def infer_lighting(meta, toks):
                     return 'bright'
                 if 'neutral' in lv or 'normal' in lv or 'day' in lv:
                     return 'neutral'
-    if KEYWORDS['low'] & toks:
+    if 'low' in hits:
         return 'low'
-    if KEYWORDS['bright'] & toks:
+    if 'bright' in hits:
         return 'bright'
-    if KEYWORDS['neutral'] & toks:
+    if 'neutral' in hits:
         return 'neutral'
     return 'neutral'  # default assumption
 
 
-def infer_quality(meta, toks, res):
+def infer_quality(meta, hits, res):
     if isinstance(meta, dict):
         for key in ['quality', 'qual']:
             v = meta.get(key)
@@ -278,15 +350,25 @@ def infer_quality(meta, toks, res):
         if h >= 720:
             return 'mq'
         return 'lq'
-    if KEYWORDS['hq'] & toks:
+    if 'hq' in hits:
         return 'hq'
-    if KEYWORDS['mq'] & toks:
+    if 'mq' in hits:
         return 'mq'
-    if KEYWORDS['lq'] & toks:
+    if 'lq' in hits:
         return 'lq'
     return 'mq'
 
 
+@functools.lru_cache(maxsize=None)
+def _axes_from_hits(hits):
+    """(label, environment, shot_type, lighting) for a video without sidecar metadata.
+
+    Without metadata these depend only on the keyword groups hit, of which there
+    are at most 2**len(KEYWORDS) combinations, so each is classified once.
+    """
+    return infer_label(None, hits), infer_environment(None, hits), infer_shot_type(None, hits), infer_lighting(None, hits)
+
+
 def detect_dataset_name(path: Path, resolved_roots):
     for root in resolved_roots:
         try:
@@ -298,99 +380,174 @@ def detect_dataset_name(path: Path, resolved_roots):
     return path.parts[1] if len(path.parts) > 1 else path.parts[0]
 
 
-def scan_datasets():
+def _is_video_name(name):
+    """Path(name).suffix.lower() in VIDEO_EXTS, without building a Path per entry"""
+    dot = name.rfind('.')
+    # Path.suffix is empty for '.mp4' and 'clip.', but '..mp4' / '...mp4' have suffix '.mp4'
+    return name != '.' and 0 < dot < len(name) - 1 and name[dot:].lower() in VIDEO_EXTS
+
+
+def _scan_dir(path):
+    """One directory level: (video file paths, subdirectories to descend into), os.walk order"""
+    videos, subdirs = [], []
+    try:
+        with os.scandir(path) as it:
+            for entry in it:
+                try:
+                    is_dir = entry.is_dir()
+                except OSError:
+                    is_dir = False
+                if is_dir:
+                    if not entry.is_symlink():  # os.walk does not follow dir symlinks
+                        subdirs.append(entry.path)
+                elif _is_video_name(entry.name):
+                    videos.append(entry.path)
+    except OSError:
+        pass
+    return videos, subdirs
+
+
+def iter_video_paths(root, pool):
+    """
+    Video paths under root in os.walk (top-down) order, yielded as each directory is
+    read; sibling directories are scanned concurrently
+    """
+    # Stack of pending sibling scans along the current path, deepest last
+    stack = [iter([pool.submit(_scan_dir, root)])]
+    while stack:
+        fut = next(stack[-1], None)
+        if fut is None:
+            stack.pop()
+            continue
+        videos, subdirs = fut.result()
+        yield from videos
+        stack.append(iter([pool.submit(_scan_dir, d) for d in subdirs]))
+
+
+def is_suitable(width, height, duration_sec):
+    """Suitability: >=10s and >=720p on either dimension"""
+    w = width if isinstance(width, int) else 0
+    h = height if isinstance(height, int) else 0
+    return (duration_sec or 0) >= 10 and max(w, h) >= 720
+
+
+def analyze_video(vp: Path, resolved_roots):
+    meta = find_sidecar_json(vp)
+    res = parse_resolution(meta, [vp.name] + list(vp.parts))
+    dur = parse_duration(meta)
+    # Parts are tokenized separately, so directory hits + file name/metadata hits == hits of the full path
+    hits = _dir_keyword_hits(vp.parent) | keyword_hits(token_set(vp, meta, parts=(vp.name,)))
+    if isinstance(meta, dict):
+        label = infer_label(meta, hits)
+        env = infer_environment(meta, hits)
+        shot = infer_shot_type(meta, hits)
+        light = infer_lighting(meta, hits)
+    else:
+        label, env, shot, light = _axes_from_hits(hits)
+    qual = infer_quality(meta, hits, res)
+    dataset_name = detect_dataset_name(vp, resolved_roots)
+    width, height = res if res else (None, None)
+    return {
+        'path': str(vp),
+        'dataset': dataset_name,
+        'label': label,
+        'environment': env,
+        'shot_type': shot,
+        'lighting': light,
+        'quality': qual,
+        'width': width,
+        'height': height,
+        'duration_sec': dur,
+        'suitable': is_suitable(width, height, dur),
+    }
+
+
+def scan_datasets(stat_threads=STAT_THREADS):
+    """Yield one record per video, in os.walk order, as the thread pool produces them"""
     resolved_roots = []
     for p in DATASET_DIRS_RAW:
         rp = resolve_dataset_path(p)
         if rp.exists():
             resolved_roots.append(rp)
-    records = []
-    for root in resolved_roots:
-        for dirpath, dirnames, filenames in os.walk(root):
-            pdir = Path(dirpath)
-            for fn in filenames:
-                if Path(fn).suffix.lower() in VIDEO_EXTS:
-                    vp = pdir / fn
-                    meta = find_sidecar_json(vp)
-                    toks = token_set(vp, meta)
-                    res = parse_resolution(meta, [vp.name] + list(vp.parts))
-                    dur = parse_duration(meta)
-                    label = infer_label(meta, toks)
-                    env = infer_environment(meta, toks)
-                    shot = infer_shot_type(meta, toks)
-                    light = infer_lighting(meta, toks)
-                    qual = infer_quality(meta, toks, res)
-                    dataset_name = detect_dataset_name(vp, resolved_roots)
-                    rec = {
-                        'path': str(vp),
-                        'dataset': dataset_name,
-                        'label': label,
-                        'environment': env,
-                        'shot_type': shot,
-                        'lighting': light,
-                        'quality': qual,
-                        'width': res[0] if res else None,
-                        'height': res[1] if res else None,
-                        'duration_sec': dur,
-                    }
-                    records.append(rec)
-    return records
-
-
-def summarize(records):
-    total = len(records)
-    by_label = Counter(r['label'] for r in records)
-    by_dataset = defaultdict(lambda: {'total': 0, 'labels': Counter(), 'environment': Counter(), 'shot_type': Counter(), 'lighting': Counter(), 'quality': Counter()})
+    # Metadata gathering is stat/open latency bound and releases the GIL, so a
+    # thread pool overlaps it; results keep the serial os.walk order. Paths are
+    # discovered lazily and at most `window` videos are in flight, so neither the
+    # path list nor the pending results grow with the dataset.
+    workers = max(1, stat_threads)
+    window = workers * ANALYZE_WINDOW_PER_THREAD
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        for root in resolved_roots:
+            for vp in iter_video_paths(root, pool):
+                if len(pending) >= window:
+                    yield pending.popleft().result()
+                pending.append(pool.submit(analyze_video, Path(vp), resolved_roots))
+        while pending:
+            yield pending.popleft().result()
+
+
+def composite_key(comp):
+    """(environment, shot_type, lighting) grouping tuple -> 'env:shot:light' output key"""
+    return ':'.join(comp)
+
+
+def summarize(records, real_out=None):
+    """Counters over an iterable of records; real-label records are appended to real_out if given"""
+    total = 0
+    # One pass over records feeds every counter (first-seen key order is unchanged)
+    by_label = Counter()
+    by_dataset = {}
+    axis_counts = {key: Counter() for key in ['environment', 'shot_type', 'lighting', 'quality']}
+    env_cnt, shot_cnt, light_cnt, qual_cnt = axis_counts.values()
+    # Composite categories for reals only (suitable considered later)
+    comp_counts = Counter()
+    suitable_real_count = 0
     for r in records:
-        ds = r['dataset']
-        by_dataset[ds]['total'] += 1
-        by_dataset[ds]['labels'][r['label']] += 1
-        by_dataset[ds]['environment'][r['environment']] += 1
-        by_dataset[ds]['shot_type'][r['shot_type']] += 1
-        by_dataset[ds]['lighting'][r['lighting']] += 1
-        by_dataset[ds]['quality'][r['quality']] += 1
+        total += 1
+        label, env, shot, light, qual = r['label'], r['environment'], r['shot_type'], r['lighting'], r['quality']
+        by_label[label] += 1
+        env_cnt[env] += 1
+        shot_cnt[shot] += 1
+        light_cnt[light] += 1
+        qual_cnt[qual] += 1
+        ds = by_dataset.get(r['dataset'])
+        if ds is None:
+            ds = by_dataset[r['dataset']] = {'total': 0, 'labels': Counter(), 'environment': Counter(), 'shot_type': Counter(), 'lighting': Counter(), 'quality': Counter()}
+        ds['total'] += 1
+        ds['labels'][label] += 1
+        ds['environment'][env] += 1
+        ds['shot_type'][shot] += 1
+        ds['lighting'][light] += 1
+        ds['quality'][qual] += 1
+        if label == 'real':
+            if real_out is not None:
+                real_out.append(r)
+            comp_counts[env, shot, light] += 1
+            if r['suitable']:
+                suitable_real_count += 1
     axes = {}
-    def axis_stats(key):
-        cnt = Counter(r[key] for r in records)
+    def axis_stats(cnt):
         total_local = sum(cnt.values()) or 1
         dist = {k: v/total_local for k, v in cnt.items()}
         over = [k for k, p in dist.items() if p >= 0.60]
         under = [k for k, p in dist.items() if p <= 0.10]
         return {'counts': dict(cnt), 'distribution': dist, 'overrepresented': over, 'underrepresented': under}
-    for key in ['environment', 'shot_type', 'lighting', 'quality']:
-        axes[key] = axis_stats(key)
-    # Composite categories for reals only (suitable considered later)
-    real_recs = [r for r in records if r['label'] == 'real']
-    comp_counts = Counter()
-    for r in real_recs:
-        comp = f"{r['environment']}:{r['shot_type']}:{r['lighting']}"
-        comp_counts[comp] += 1
-    # Suitability: >=10s and >=720p on either dimension
-    def is_suitable(r):
-        dur_ok = (r['duration_sec'] or 0) >= 10
-        h = max([x for x in [r['width'], r['height']] if isinstance(x, int)] + [0])
-        res_ok = h >= 720 if h else False
-        return dur_ok and res_ok
-    suitable_reals = [r for r in real_recs if is_suitable(r)]
+    for key, cnt in axis_counts.items():
+        axes[key] = axis_stats(cnt)
     return {
         'total': total,
         'by_label': dict(by_label),
         'by_dataset': {ds: {'total': v['total'], 'labels': dict(v['labels']), 'environment': dict(v['environment']), 'shot_type': dict(v['shot_type']), 'lighting': dict(v['lighting']), 'quality': dict(v['quality'])} for ds, v in by_dataset.items()},
         'axes': axes,
-        'composite_counts_real': dict(comp_counts),
-        'suitable_real_count': len(suitable_reals),
+        'composite_counts_real': {composite_key(c): n for c, n in comp_counts.items()},
+        'suitable_real_count': suitable_real_count,
     }
 
 
 def compute_sampling(records, summary):
     # Target on suitable real videos; fallback to all reals then all
     real_recs = [r for r in records if r['label'] == 'real']
-    def is_suitable(r):
-        dur_ok = (r['duration_sec'] or 0) >= 10
-        h = max([x for x in [r['width'], r['height']] if isinstance(x, int)] + [0])
-        res_ok = h >= 720 if h else False
-        return dur_ok and res_ok
-    suitable_reals = [r for r in real_recs if is_suitable(r)]
+    suitable_reals = [r for r in real_recs if r['suitable']]
     pool = suitable_reals if suitable_reals else real_recs if real_recs else []
     total_available = len(pool)
     if total_available == 0:
@@ -406,13 +563,12 @@ def compute_sampling(records, summary):
     # Build composite categories
     comp_to_indices = defaultdict(list)
     for idx, r in enumerate(pool):
-        comp = f"{r['environment']}:{r['shot_type']}:{r['lighting']}"
-        comp_to_indices[comp].append(idx)
+        comp_to_indices[r['environment'], r['shot_type'], r['lighting']].append(idx)
     categories = list(comp_to_indices.keys())
     k = len(categories)
     if k == 0:
         # All unknowns; treat as single category
-        categories = ['unknown:other:neutral']
+        categories = [('unknown', 'other', 'neutral')]
         comp_to_indices[categories[0]] = list(range(len(pool)))
         k = 1
     base_quota = max(1, target // k)
@@ -422,36 +578,65 @@ def compute_sampling(records, summary):
     remainder = target - allocated
     # Rank categories by current availability ascending to favor scarce ones, but ensure we don't exceed availability
     avail_sorted = sorted(categories, key=lambda c: len(comp_to_indices[c]))
-    i = 0
-    while remainder > 0 and any(quotas[c] < len(comp_to_indices[c]) for c in categories):
-        c = avail_sorted[i % len(avail_sorted)]
-        if quotas[c] < len(comp_to_indices[c]):
-            quotas[c] += 1
-            remainder -= 1
-        i += 1
-        if i > 100000:  # safety
+    # Round-robin one unit per category with headroom, done as whole rounds at a time
+    while remainder > 0:
+        open_cats = [c for c in avail_sorted if quotas[c] < len(comp_to_indices[c])]
+        if not open_cats:
+            break
+        rounds = min(remainder // len(open_cats),
+                     min(len(comp_to_indices[c]) - quotas[c] for c in open_cats))
+        if rounds == 0:
+            # Final partial round goes to the scarcest categories first
+            for c in open_cats[:remainder]:
+                quotas[c] += 1
             break
+        for c in open_cats:
+            quotas[c] += rounds
+        remainder -= rounds * len(open_cats)
     # Select concretely (deterministic: path sort within category)
     selected_indices = []
     for c in categories:
-        idxs = comp_to_indices[c]
-        idxs_sorted = sorted(idxs, key=lambda ix: pool[ix]['path'])
-        selected_indices.extend(idxs_sorted[:quotas[c]])
+        # Only the first quota paths are needed, not the whole category sorted
+        selected_indices.extend(heapq.nsmallest(quotas[c], comp_to_indices[c], key=lambda ix: pool[ix]['path']))
     selected = [pool[ix] for ix in selected_indices]
     selected_counts = Counter()
     for r in selected:
-        comp = f"{r['environment']}:{r['shot_type']}:{r['lighting']}"
-        selected_counts[comp] += 1
+        selected_counts[r['environment'], r['shot_type'], r['lighting']] += 1
     return {
         'target_total_real': target,
-        'category_quota': quotas,
+        'category_quota': {composite_key(c): q for c, q in quotas.items()},
         'selected': selected,
-        'selected_counts': dict(selected_counts),
+        'selected_counts': {composite_key(c): n for c, n in selected_counts.items()},
         'notes': ''
     }
 
 
+def write_json(path, obj):
+    if orjson is not None:
+        Path(path).write_bytes(orjson.dumps(obj, option=orjson.OPT_INDENT_2))
+        return
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(obj, f, indent=2)
+
+
+def write_jsonl(path, recs):
+    # Whole body encoded up front, then a single write
+    if orjson is not None:
+        body = b''.join(orjson.dumps(rec, option=orjson.OPT_APPEND_NEWLINE) for rec in recs)
+    else:
+        body = ''.join(json.dumps(rec) + "\n" for rec in recs).encode('utf-8')
+    Path(path).write_bytes(body)
+
+
 def write_outputs(records, summary, sampling):
+    # The four files are independent: encode each, then let a small pool overlap the writes
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        writes = list(_submit_outputs(pool, summary, sampling))
+    for fut in writes:
+        fut.result()
+
+
+def _submit_outputs(pool, summary, sampling):
     now_iso = datetime.datetime.utcnow().isoformat() + 'Z'
     report = {
         'generated_at': now_iso,
@@ -464,24 +649,23 @@ def write_outputs(records, summary, sampling):
         'axes': summary['axes'],
         'composite_counts_real': summary['composite_counts_real'],
     }
-    with open(REPORT_JSON, 'w', encoding='utf-8') as f:
-        json.dump(report, f, indent=2)
-
-    with open(REAL_SOURCES_JSONL, 'w', encoding='utf-8') as f:
-        for r in sampling['selected']:
-            rec = {
-                'path': r['path'],
-                'dataset': r['dataset'],
-                'label': r['label'],
-                'environment': r['environment'],
-                'shot_type': r['shot_type'],
-                'lighting': r['lighting'],
-                'quality': r['quality'],
-                'width': r['width'],
-                'height': r['height'],
-                'duration_sec': r['duration_sec'],
-            }
-            f.write(json.dumps(rec) + "\n")
+    yield pool.submit(write_json, REPORT_JSON, report)
+
+    real_sources = []
+    for r in sampling['selected']:
+        real_sources.append({
+            'path': r['path'],
+            'dataset': r['dataset'],
+            'label': r['label'],
+            'environment': r['environment'],
+            'shot_type': r['shot_type'],
+            'lighting': r['lighting'],
+            'quality': r['quality'],
+            'width': r['width'],
+            'height': r['height'],
+            'duration_sec': r['duration_sec'],
+        })
+    yield pool.submit(write_jsonl, REAL_SOURCES_JSONL, real_sources)
 
     diversity = {
         'generated_at': now_iso,
@@ -491,8 +675,7 @@ def write_outputs(records, summary, sampling):
         'axis_overrepresented': {ax: summary['axes'][ax]['overrepresented'] for ax in ['environment','shot_type','lighting','quality']},
         'axis_underrepresented': {ax: summary['axes'][ax]['underrepresented'] for ax in ['environment','shot_type','lighting','quality']},
     }
-    with open(DIVERSITY_BALANCE_JSON, 'w', encoding='utf-8') as f:
-        json.dump(diversity, f, indent=2)
+    yield pool.submit(write_json, DIVERSITY_BALANCE_JSON, diversity)
 
     # Expected 10s clips from selected reals
     def clips_from_duration(d):
@@ -554,15 +737,18 @@ def write_outputs(records, summary, sampling):
     lines.append("## Verdict: FEASIBLE with sampling strategy applied")
     lines.append("Datasets contain sufficient diversity IF properly sampled; without sampling, training may skew towards dominant categories.")
 
-    with open(VERDICT_MD, 'w', encoding='utf-8') as f:
-        f.write("\n".join(lines) + "\n")
+    yield pool.submit(VERDICT_MD.write_text, "\n".join(lines) + "\n", encoding='utf-8')
 
 
 def main():
-    records = scan_datasets()
-    summary = summarize(records)
-    sampling = compute_sampling(records, summary)
-    write_outputs(records, summary, sampling)
+    ap = argparse.ArgumentParser(description="Analyze dataset diversity and build a balanced real-video sampling plan")
+    ap.add_argument("--stat-threads", type=int, default=STAT_THREADS, help=f"Threads for directory scans and sidecar lookups (default: {STAT_THREADS})")
+    args = ap.parse_args()
+    # Stream records through summarize; only the real ones are kept for sampling
+    real_records = []
+    summary = summarize(scan_datasets(stat_threads=args.stat_threads), real_out=real_records)
+    sampling = compute_sampling(real_records, summary)
+    write_outputs(real_records, summary, sampling)
     print(f"Wrote: {REPORT_JSON}, {REAL_SOURCES_JSONL}, {DIVERSITY_BALANCE_JSON}, {VERDICT_MD}")
 
 if __name__ == '__main__':